@@ -0,0 +1,85 @@
+'''Scaling benchmark of the timeline plotting path.
+
+Builds synthetic timelines with a growing number of rows and dates and times
+figure construction and an Agg draw, once with TimelinePlot (one artist per
+artist type) and once with the old one-artist-per-date loop for comparison.
+
+    python benchmarks/bench_render.py
+'''
+import os
+import sys
+import time
+import random
+import logging
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import timeliner
+
+logging.getLogger('matplotlib.font_manager').disabled = True
+
+
+def synthetic_timeline(nrows, ndates, seed=0):
+    '''Timeline spanning 2000-2029, every 2nd row with an interval'''
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(nrows):
+        months = sorted(rnd.sample(range(12*30), ndates))
+        dates = [f'{m % 12 + 1:02d}/{m // 12:02d}' for m in months]
+        rows.append(timeliner.TimelineRow(f'Arbeit {i}', dates,
+                                          rnd.choice([3, 6, 12]) if i % 2 else None))
+    return timeliner.Timeline.from_rows(rows, '01/00', '12/29')
+
+
+def legacy_figure(timeline):
+    '''one Line2D per date marker and one LineCollection per interval bar'''
+    from datetime import datetime
+    from dateutil.relativedelta import relativedelta
+    fig = Figure(figsize=(5.5, .5+len(timeline)/3), layout='constrained')
+    ax = fig.subplots()
+    end_date = timeliner.ordinal2datetime(timeline.end)
+    ax.set_xlim(timeliner.ordinal2datetime(timeline.start), end_date)
+    for y_pos, row in enumerate(timeline):
+        interval = row.interval
+        dates = [datetime.strptime(ds, '%m/%y') for ds in row.date_strs()]
+        for date in dates:
+            ax.plot(date, y_pos, 'k|', markersize=8, markeredgewidth=2, zorder=3)
+        if interval is not None:
+            for date in dates:
+                ax.hlines(y=y_pos, xmin=date,
+                          xmax=min(date + relativedelta(months=interval), end_date),
+                          colors='tab:blue', linewidth=2, alpha=0.35, zorder=2)
+    return fig
+
+
+def time_it(make_fig, data):
+    t0 = time.perf_counter()
+    fig = make_fig(data)
+    t1 = time.perf_counter()
+    FigureCanvasAgg(fig).draw()
+    t2 = time.perf_counter()
+    n_artists = len(fig.axes[0].get_children())
+    return t1-t0, t2-t1, n_artists
+
+
+def main():
+    print(f'{"rows":>6} {"dates":>6} | {"build":>8} {"draw":>8} {"artists":>8} |'
+          f' {"legacy build":>12} {"legacy draw":>11} {"artists":>8}')
+    for nrows in [10, 100, 300, 1000]:
+        for ndates in [10, 40]:
+            data = synthetic_timeline(nrows, ndates)
+            build, draw, n = time_it(timeliner.render_timeline, data)
+            line = f'{nrows:>6} {ndates:>6} | {build:>7.3f}s {draw:>7.3f}s {n:>8} |'
+            if nrows*ndates <= 12000:
+                build, draw, n = time_it(legacy_figure, data)
+                line += f' {build:>11.3f}s {draw:>10.3f}s {n:>8}'
+            else: line += f' {"skipped":>12}'
+            print(line, flush=True)
+
+
+if __name__ == '__main__':
+    main()
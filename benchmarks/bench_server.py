@@ -0,0 +1,71 @@
+'''Load test of the render server (python timeliner.py serve).
+
+Sends --requests POST /render requests from --concurrency threads to a
+running server, half of them repeating the same timeline (cache hits), and
+reports the client side latency percentiles, throughput and the 503 rate,
+followed by the server's /metrics.
+
+    python timeliner.py serve -j 4 &
+    python benchmarks/bench_server.py --url http://127.0.0.1:8765 --requests 200
+'''
+import sys
+import json
+import time
+import random
+import argparse
+import http.client
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+
+def synthetic_timeline(i, nrows=20, seed=0):
+    '''timeline dict for POST /render, even i give the same timeline'''
+    rnd = random.Random(seed if i % 2 == 0 else seed + i)
+    rows = []
+    for r in range(nrows):
+        months = sorted(rnd.sample(range(12*10), rnd.randint(1, 12)))
+        rows.append({'title': f'Arbeit {r}', 'interval': 6 if r % 2 else None,
+                     'dates': [f'{m % 12 + 1:02d}/{m // 12 + 20:02d}' for m in months]})
+    return {'name': f'last_{i}', 'start': '01/20', 'end': '12/29', 'rows': rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8765')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--format', default='png')
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args()
+    url = urlsplit(args.url)
+    bodies = [json.dumps(synthetic_timeline(i)).encode() for i in range(args.requests)]
+
+    def request(body):
+        con = http.client.HTTPConnection(url.hostname, url.port, timeout=120)
+        t0 = time.perf_counter()
+        con.request('POST', f'/render?format={args.format}&dpi={args.dpi}', body)
+        response = con.getresponse()
+        response.read()
+        con.close()
+        return response.status, time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(request, bodies))
+    total = time.perf_counter() - t0
+    latencies = sorted(seconds * 1000 for status, seconds in results if status == 200)
+    statuses = {}
+    for status, _ in results: statuses[status] = statuses.get(status, 0) + 1
+    if latencies:
+        pct = lambda p: latencies[min(len(latencies)-1, int(p / 100 * len(latencies)))]
+        print(f'{len(latencies)} ok in {total:.2f} s: {len(latencies)/total:.1f}/s, '
+              f'p50 {pct(50):.0f} ms, p95 {pct(95):.0f} ms, p99 {pct(99):.0f} ms')
+    print(f'status codes: {statuses}')
+    con = http.client.HTTPConnection(url.hostname, url.port)
+    con.request('GET', '/metrics')
+    print(json.dumps(json.loads(con.getresponse().read()), indent=1))
+    return 0 if statuses.get(200, 0) == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+'''Cold start benchmark: import time of timeliner and first paint of the editor.
+
+Import time is taken from `python -X importtime -c "import timeliner"` in a
+fresh interpreter (best of --runs). First paint is the time from interpreter
+start until the TimelineEditor window has been mapped and drawn, it is
+skipped when no display is available.
+
+    python benchmarks/bench_startup.py --max-import-ms 250 --max-paint-ms 600
+
+Exits with 1 if a limit is exceeded or if one of the modules that must only
+be loaded lazily (matplotlib, pandas, ipydex) is imported at startup.
+'''
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+LAZY_MODULES = ('matplotlib', 'pandas', 'ipydex')
+
+FIRST_PAINT = '''
+import time
+import timeliner
+root = timeliner.TimelineEditor()
+root.update()
+print(time.time())
+root.destroy()
+'''
+
+
+def run_importtime():
+    '''returns (cumulative µs of timeliner, {module: (self µs, cumulative µs)})'''
+    env = dict(os.environ)
+    env.pop('TIMELINER_DEBUG', None)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import timeliner'],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line: continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cum_us))
+    return modules['timeliner'][1], modules
+
+
+def run_first_paint():
+    '''returns ms from interpreter start to the first drawn editor window or
+    None if there is no display'''
+    t_start = time.time()
+    proc = subprocess.run([sys.executable, '-c', FIRST_PAINT], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        if 'TclError' in proc.stderr: return None
+        raise RuntimeError(proc.stderr)
+    return (float(proc.stdout) - t_start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=None)
+    parser.add_argument('--max-paint-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    results = [run_importtime() for _ in range(args.runs)]
+    import_ms = min(r[0] for r in results) / 1000
+    modules = results[0][1]
+    print(f'import timeliner: {import_ms:.1f} ms (best of {args.runs})')
+    print('largest imports (cumulative):')
+    top_level = [(cum, name) for name, (_, cum) in modules.items()
+                 if '.' not in name and name != 'timeliner']
+    for cum, name in sorted(top_level, reverse=True)[:8]:
+        print(f'  {cum/1000:8.1f} ms  {name}')
+
+    failed = False
+    eager = sorted({name.split('.')[0] for name in modules} & set(LAZY_MODULES))
+    if eager:
+        print(f'FAIL: imported at startup: {", ".join(eager)}')
+        failed = True
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f'FAIL: import time above {args.max_import_ms} ms')
+        failed = True
+
+    paint_ms = [run_first_paint() for _ in range(args.runs)]
+    if None in paint_ms:
+        print('first paint: skipped (no display)')
+    else:
+        paint_ms = min(paint_ms)
+        print(f'first paint: {paint_ms:.1f} ms (best of {args.runs})')
+        if args.max_paint_ms is not None and paint_ms > args.max_paint_ms:
+            print(f'FAIL: first paint above {args.max_paint_ms} ms')
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+'''Benchmark suite of the whole path from typed dates to the saved file.
+
+Runs headless on Agg with synthetic timelines of 10, 100, 1k and 10k rows
+(1-30 dates per row, every 2nd row with an interval) and times, per size:
+
+    parse     mm/yy strings to month ordinals (monthyear2ordinal, cache cleared)
+    model     Timeline.from_rows from the typed rows (what the editor does)
+    ticks     x tick computation (month_ticks, cache bypassed)
+    figure    figure construction (render_timeline)
+    draw      Agg draw
+    savefig   png at 100 dpi
+    pages     paged pdf export (save_pages, 40 rows per page)
+
+Times are the best of --repeat runs (a single run for stages taking over a
+second), peak memory (Python and numpy allocations, tracemalloc) is taken
+in one extra run. draw and savefig are skipped for figures taller than Agg
+can rasterize.
+
+    python benchmarks/bench_suite.py --save results.json
+    python benchmarks/bench_suite.py --compare results.json --tolerance 1.5
+
+With --compare the run fails (exit 1) if a stage got slower than tolerance
+times the stored result (and by more than --min-delta-ms, to ignore noise)
+or its peak memory grew by more than the same factor.
+'''
+import io
+import os
+import sys
+import gc
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import timeliner
+
+logging.getLogger('matplotlib.font_manager').disabled = True
+
+SIZES = [10, 100, 1000, 10000]
+AGG_MAX_PIXELS = 2**16                  # Agg can't draw larger images
+
+
+def synthetic_rows(nrows, seed=0):
+    '''rows as typed into the editor: (title, interval, [mm/yy, ...]) between
+    01/00 and 12/29'''
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(nrows):
+        months = sorted(rnd.sample(range(12*30), rnd.randint(1, 30)))
+        dates = [f'{m % 12 + 1:02d}/{m // 12:02d}' for m in months]
+        rows.append((f'Arbeit {i}', rnd.choice(['3', '6', '12']) if i % 2 else '', dates))
+    return rows
+
+
+def stages(rows, tmpdir):
+    '''(name, function) of all stages, each function gets the result of the
+    previous one'''
+    def parse(_):
+        timeliner.monthyear2ordinal.cache_clear()
+        return [timeliner.monthyears2ordinals(dates) for _, _, dates in rows]
+
+    def model(_):
+        timeliner.monthyear2ordinal.cache_clear()
+        return timeliner.Timeline.from_rows(
+            [timeliner.TimelineRow(title, dates, interval) for title, interval, dates in rows],
+            '01/00', '12/29')
+
+    def ticks(timeline):
+        timeliner.month_ticks.__wrapped__(timeline.start, timeline.end,
+                                          timeline.start, timeline.end)
+        return timeline
+
+    def figure(timeline):
+        return timeline, timeliner.render_timeline(timeline)
+
+    def draw(arg):
+        FigureCanvasAgg(arg[1]).draw()
+        return arg
+
+    def savefig(arg):
+        arg[1].savefig(io.BytesIO(), format='png', dpi=100)
+        return arg
+
+    def pages(arg):
+        timeliner.save_pages(arg[0], os.path.join(tmpdir, 'pages.pdf'), 40, 'pdf')
+        return arg
+
+    return [('parse', parse), ('model', model), ('ticks', ticks), ('figure', figure),
+            ('draw', draw), ('savefig', savefig), ('pages', pages)]
+
+
+def rasterizable(fig, dpi):
+    return max(fig.get_size_inches()) * dpi < AGG_MAX_PIXELS
+
+
+def run_size(nrows, repeat, tmpdir):
+    '''{stage: {'seconds', 'peak_kib'} or None if skipped}'''
+    rows = synthetic_rows(nrows)
+    results = {}
+    arg = None
+    for name, func in stages(rows, tmpdir):
+        if name in ('draw', 'savefig') and \
+                not rasterizable(arg[1], arg[1].dpi if name == 'draw' else 100):
+            results[name] = None
+            continue
+        best = float('inf')
+        for _ in range(repeat):
+            gc.collect()
+            t0 = time.perf_counter()
+            out = func(arg)
+            best = min(best, time.perf_counter() - t0)
+            if best > 1: break          # slow stages are stable enough after one run
+        gc.collect()
+        tracemalloc.start()
+        func(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {'seconds': best, 'peak_kib': peak / 1024}
+        arg = out
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta):
+    '''returns the list of regressions against baseline'''
+    regressions = []
+    for size, stages_ in results.items():
+        for name, new in stages_.items():
+            old = baseline.get(size, {}).get(name)
+            if new is None or old is None: continue
+            if new['seconds'] > old['seconds'] * tolerance and \
+                    new['seconds'] - old['seconds'] > min_delta:
+                regressions.append(f'{size} rows {name}: {old["seconds"]*1000:.1f} ms'
+                                   f' -> {new["seconds"]*1000:.1f} ms')
+            if new['peak_kib'] > old['peak_kib'] * tolerance and \
+                    new['peak_kib'] - old['peak_kib'] > 1024:
+                regressions.append(f'{size} rows {name}: peak {old["peak_kib"]:.0f} KiB'
+                                   f' -> {new["peak_kib"]:.0f} KiB')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', metavar='JSON', help='write the results to this file')
+    parser.add_argument('--compare', metavar='JSON', help='fail on regressions against this file')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    parser.add_argument('--min-delta-ms', type=float, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    print(f'{"rows":>6} | ' + ' '.join(f'{name:>9}' for name, _ in stages([], '')) + ' | peak')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for nrows in args.sizes:
+            results[str(nrows)] = res = run_size(nrows, args.repeat, tmpdir)
+            times = ' '.join(f'{"skipped":>9}' if r is None else f'{r["seconds"]*1000:>7.1f}ms'
+                             for r in res.values())
+            peak = max(r['peak_kib'] for r in res.values() if r is not None)
+            print(f'{nrows:>6} | {times} | {peak/1024:.1f} MiB', flush=True)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                                'python': platform.python_version(),
+                                'numpy': np.__version__,
+                                'matplotlib': matplotlib.__version__,
+                                'machine': platform.platform()},
+                       'results': results}, f, indent=1)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms / 1000)
+        for regression in regressions: print(f'FAIL: {regression}')
+        if regressions: return 1
+        print(f'no regressions against {args.compare}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,21 @@
+'''output file names of batch renders'''
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import timeliner
+
+
+def test_unique_names():
+    assert timeliner.unique_names(['a', 'b', 'a', 'a_2', 'a']) == ['a', 'b', 'a_3', 'a_2', 'a_4']
+
+
+def test_names_with_a_path_are_turned_down(tmp_path):
+    outdir = tmp_path / 'out'
+    outdir.mkdir()
+    for name in ('../x', 'a/b', 'a\\b', '..', ''):
+        job = {'name': name, 'start': '01/20', 'end': '12/20',
+               'rows': [{'title': 'x', 'interval': 6, 'dates': ['01/20']}]}
+        _, path, error, _ = timeliner._render_job(job, str(outdir), 50)
+        assert path is None and error.startswith('ValueError'), name
+    assert not os.listdir(tmp_path / 'out') and os.listdir(tmp_path) == ['out']
@@ -0,0 +1,54 @@
+'''read_logbook: column detection, merging and the error report'''
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import timeliner
+
+
+def write(tmp_path, text):
+    path = tmp_path / 'logbuch.csv'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def read_all(path, chunk_size=1000):
+    rows, errors = {}, []
+    for chunk, chunk_errors, _ in timeliner.read_logbook(path, chunk_size):
+        for row in chunk:
+            interval, dates = rows.setdefault(row.title, [row.interval, []])
+            if interval is None: rows[row.title][0] = row.interval
+            dates.extend(row.date_strs())
+        errors.extend(chunk_errors)
+    return rows, errors
+
+
+def test_columns_merging_and_errors(tmp_path):
+    path = write(tmp_path, 'Datum;Bemerkung;TITEL;Intervall\n'
+                           '01/20 03/20;x;Pumpe;6\n'
+                           '07/20;;Filter;\n'
+                           '13/20, 08/20;;Pumpe;\n'
+                           '09/20;;;12\n'
+                           '10/20;;Filter;sechs\n'
+                           '11/20;;Filter;3\n')
+    rows, errors = read_all(path)
+    assert rows == {'Pumpe': [6, ['01/20', '03/20', '08/20']], 'Filter': [3, ['07/20', '11/20']]}
+    assert len(errors) == 3
+    assert errors[0].startswith('Zeile 4 (Pumpe): Monat muss')
+    assert errors[1] == 'Zeile 5: Titel fehlt.'
+    assert errors[2].startswith('Zeile 6 (Filter): Intervall muss')
+
+
+def test_missing_columns(tmp_path):
+    with pytest.raises(ValueError, match='Titel und Datum'):
+        list(timeliner.read_logbook(write(tmp_path, 'Titel,Intervall\nPumpe,6\n')))
+
+
+def test_blank_lines_dont_make_chunks_longer(tmp_path):
+    lines = [f'r{i},01/20' for i in range(9)]
+    lines[3:3] = ['', ',']
+    path = write(tmp_path, 'title,date\n' + '\n'.join(lines) + '\n')
+    chunks = [len(rows) for rows, _, _ in timeliner.read_logbook(path, chunk_size=3)]
+    assert chunks == [3, 3, 3, 0]
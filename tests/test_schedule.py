@@ -0,0 +1,48 @@
+'''Schedule against a plain loop over the rows'''
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import timeliner
+
+
+def loop_schedule(timeline, as_of):
+    '''{row: (last, next_due, overdue, late, overdue_months, max_gap, periods)}'''
+    out = {}
+    for r, row in enumerate(timeline):
+        dates = sorted(d for d in row.dates.tolist() if d <= as_of)
+        if not row.interval or not dates: continue
+        periods = [(a + row.interval, b) for a, b in zip(dates, dates[1:] + [as_of])
+                   if a + row.interval < b]
+        out[r] = (dates[-1], dates[-1] + row.interval, max(as_of - dates[-1] - row.interval, 0),
+                  len(periods), sum(b - a for a, b in periods),
+                  max((b - a for a, b in zip(dates, dates[1:])), default=-1), periods)
+    return out
+
+
+def test_matches_loop():
+    rnd = random.Random(3)
+    rows = [timeliner.TimelineRow(f'r{i}', [rnd.randrange(24000, 24240) for _ in range(rnd.randint(0, 15))],
+                                  rnd.choice([None, 0, 3, 6, 12, 24]))
+            for i in range(2000)]
+    timeline = timeliner.Timeline.from_rows(rows, 24000, 24300)
+    for as_of in (24100, 24250):
+        schedule = timeliner.Schedule(timeline, as_of)
+        expected = loop_schedule(timeline, as_of)
+        assert schedule.rows.tolist() == list(expected)
+        for i, row in enumerate(schedule.rows.tolist()):
+            assert (schedule.last[i], schedule.next_due[i], schedule.overdue[i], schedule.late[i],
+                    schedule.overdue_months[i], schedule.max_gap[i]) == expected[row][:6]
+        periods = sorted((row, a, b) for row, v in expected.items() for a, b in v[6])
+        assert periods == sorted(zip(schedule.period_rows.tolist(), schedule.period_starts.tolist(),
+                                     schedule.period_ends.tolist()))
+
+
+def test_dates_after_as_of_are_ignored():
+    timeline = timeliner.Timeline.from_rows([timeliner.TimelineRow('P', ['01/20', '01/22'], 6)],
+                                            '01/20', '12/23')
+    schedule = timeliner.Schedule(timeline, timeliner.monthyear2ordinal('03/21'))
+    report, = schedule.report()
+    assert (report['last'], report['next_due'], report['status']) == ('01/20', '07/20', 'überfällig')
+    assert (report['overdue'], report['overdue_months']) == ('8', '8')
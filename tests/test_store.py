@@ -0,0 +1,72 @@
+'''TimelineStore round trip and find() against a plain loop'''
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import timeliner
+
+
+def random_timelines(n, seed=5):
+    rnd = random.Random(seed)
+    timelines = []
+    for i in range(n):
+        # rows without dates (also the last one) need the offsets from bincount
+        rows = [timeliner.TimelineRow(f'Arbeit {rnd.randrange(30)}',
+                                      [rnd.randrange(24000, 24120) for _ in range(rnd.choice([0, 1, 3, 8]))],
+                                      rnd.choice([None, 0, 6, 12]))
+                for _ in range(rnd.randint(1, 6))]
+        timelines.append(timeliner.Timeline.from_rows(rows, 24000, 24130, f'objekt_{i:04d}'))
+    return timelines
+
+
+def loop_find(timelines, title=None, date_from=None, date_to=None):
+    found = []
+    for timeline in timelines:
+        for row in timeline:
+            if title is not None and row.title != title: continue
+            dates = row.dates.tolist()
+            if date_from is not None: dates = [d for d in dates if d >= date_from]
+            if date_to is not None: dates = [d for d in dates if d <= date_to]
+            if dates or date_from is date_to is None:
+                found.append(timeline.name)
+                break
+    return sorted(found)
+
+
+def test_round_trip(tmp_path):
+    store = timeliner.TimelineStore(str(tmp_path / 'store.sqlite'))
+    try:
+        timelines = random_timelines(1200)
+        # more than max_vars per call and several transactions
+        assert store.save(timelines, batch_size=700) == 1200
+        loaded = store.load()
+        assert [tl.to_dict() for tl in loaded] == [tl.to_dict() for tl in timelines]
+        assert [tl.name for tl in store.load(['objekt_0007', 'fehlt', 'objekt_0003'])] \
+            == ['objekt_0007', 'objekt_0003']
+
+        # the last of repeated names wins, saving again replaces
+        changed = random_timelines(2, seed=6)
+        for timeline in changed: timeline.name = 'objekt_0001'
+        assert store.save(changed) == 1
+        assert store.load(['objekt_0001'])[0].to_dict() == changed[1].to_dict()
+        store.delete(['objekt_0002'])
+        assert len(store.load()) == 1199
+    finally: store.close()
+
+
+def test_find(tmp_path):
+    store = timeliner.TimelineStore(str(tmp_path / 'store.sqlite'))
+    try:
+        timelines = random_timelines(300)
+        store.save(timelines)
+        for title, date_from, date_to in (('Arbeit 3', 24010, 24020), ('Arbeit 7', None, 24005),
+                                          ('Arbeit 11', None, None), (None, 24100, 24101),
+                                          ('Arbeit 2', '01/2001', '03/01')):
+            expected = loop_find(timelines, title,
+                                 *(timeliner.monthyear2ordinal(d) if isinstance(d, str) else d
+                                   for d in (date_from, date_to)))
+            assert store.find(title=title, date_from=date_from, date_to=date_to) == expected
+        assert store.find(name='objekt_0010') == ['objekt_0010']
+        assert store.find(name='objekt_0010', title='nicht da') == []
+    finally: store.close()
@@ -0,0 +1,35 @@
+'''month_ticks against the tick filtering loop it replaced'''
+import os
+import sys
+import random
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import timeliner
+
+
+def loop_ticks(start, end):
+    '''ticks (month ordinals) of the whole timeline as the old loop over
+    AutoDateLocator's ticks picked them'''
+    import matplotlib.dates as mdates
+    start_date = datetime(start // 12, start % 12 + 1, 1)
+    end_date = datetime(end // 12, end % 12 + 1, 1)
+    datespan = (end_date-start_date).days / 30
+    min_distance = round(datespan*1.5)
+    ticks = {start_date, end_date}
+    for tick in mdates.AutoDateLocator().tick_values(start_date, end_date):
+        tick_date = mdates.num2date(tick).replace(tzinfo=None)
+        if tick_date < start_date or tick_date > end_date: continue
+        if (tick_date - start_date).days > min_distance and (end_date - tick_date).days > min_distance:
+            ticks.add(tick_date)
+    return sorted(d.year*12 + d.month-1 for d in ticks)
+
+
+def test_matches_loop():
+    # the old loop got day ticks below 5 months, month_ticks keeps to months
+    rnd = random.Random(11)
+    spans = list(range(5, 150)) + [rnd.randrange(150, 1200) for _ in range(150)]
+    for span in spans:
+        start = rnd.randrange(1990*12, 2040*12)
+        assert timeliner.month_ticks(start, start + span, start, start + span).tolist() \
+            == loop_ticks(start, start + span), (start, span)
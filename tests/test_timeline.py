@@ -0,0 +1,32 @@
+'''Timeline.from_dict, the input of the server, batch and CLI'''
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import timeliner
+
+
+def from_row(dates, interval=6):
+    return timeliner.Timeline.from_dict({'name': 'a', 'start': '01/20', 'end': '12/22',
+                                         'rows': [{'title': 'x', 'interval': interval, 'dates': dates}]})
+
+
+def test_round_trip():
+    timeline = from_row(['01/20', '07/2021'], '6')
+    assert timeliner.Timeline.from_dict(timeline.to_dict()).digest() == timeline.digest()
+    assert list(timeline)[0] == timeliner.TimelineRow('x', ['01/20', '07/21'], 6)
+    assert list(from_row(['01/20'], 6.0))[0].interval == 6
+
+
+@pytest.mark.parametrize('dates', [[2020], [24000.7], '01/20', ['01/20', 24000]])
+def test_dates_must_be_strings(dates):
+    with pytest.raises(ValueError):
+        from_row(dates)
+
+
+@pytest.mark.parametrize('interval', [True, 1.5, -1, 'sechs'])
+def test_bad_intervals(interval):
+    with pytest.raises(ValueError):
+        from_row(['01/20'], interval)
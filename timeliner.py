@@ -4,20 +4,32 @@ from tkinter import filedialog
 
 
 import sys
-import pandas as pd
+import os
+import csv
+import re
+import io
+import json
+import queue
+import sqlite3
+import hashlib
+import threading
+import time
+import argparse
+import numpy as np
 import platform
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+from functools import lru_cache
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.dates as mdates
-import matplotlib.patches as mpatches
-from matplotlib.ticker import FixedLocator
+# matplotlib is imported where it is needed (first preview, export, batch
+# workers), so the editor window appears without waiting for it
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
-from ipydex import IPS
+if os.environ.get('TIMELINER_DEBUG'):
+    from ipydex import IPS
 
 
 
@@ -29,31 +41,67 @@ class TimelineEditor(tk.Tk):
     interval_col = 1
     dates_col = 2
 
-    def __init__(self, **kwargs):
+    def __init__(self, store: Optional['TimelineStore']=None,
+                 name: Optional[str]=None, show_timings: bool=False,
+                 import_path: Optional[str]=None, **kwargs):
         super().__init__(**kwargs)
         self.title('Zeitstrahl erzeugen')
+        self.store = store
         self.minsize(800, 500)
-        self.lines = []
-        self.in_displaying = False             # flag for automatically updating preview, used only internally to avoid focussing out of an entry...
-        self.figure = None
         self.curr_tl = None
+        self.preview_delay = 50                 # ms without new input before the preview drafts
+        self.rows_per_page = 40                 # rows per page of pdf/svg exports
+        self.export_dpi = 300                   # of png exports
+        self.preview_after = None
+        self.preview_image = None               # shown PhotoImage
+        self.full_image = None                  # PhotoImages the renders are copied into
+        self.draft_image = None
+        self.preview_view = None                # x limits the preview is zoomed to, None for all
+        self.preview_geometry = None            # (x0, x1, xlim, default_xlim) of the shown preview
+        self.preview_drag = None                # (x, view) where panning started
+        self.importer = None                    # read_logbook generator of a running import
+        self.import_chunk_after = 1             # ms between import chunks, lets Tk handle events
+        self.max_import_errors = 30             # errors listed in the import report
+        self.renderer = PreviewRenderer(self, self.show_preview)
+        self.render_cache = RenderCache()
 
         self.allfrm = ttk.Frame(self)
-        scrl = ScrollFrame(self.allfrm, orient='horizontal', def_width=800)
-        self.workfrm = scrl.viewPort
-        self.curr_row = 0
+        self.startendfrm = ttk.Frame(self.allfrm)
+        # all line data lives in self.lines, the view only has widgets for
+        # the visible part of it
+        self.lines = [LineData()]
+        self.n_untitled = 1             # lines with empty title
+        self.max_dates = 1              # date cells of the longest line
+        self.view = LinesView(self, self.allfrm)
         
         self.btnsfrm = ttk.Frame(self.allfrm)
         self.previewfrm = ttk.Frame(self.allfrm)
+        self.preview_label = ttk.Label(self.previewfrm)
         self.build_structure()
+        # status bar with the duration of the last preview render
+        self.statusvar = tk.StringVar(self)
+        if show_timings:
+            ttk.Label(self, textvariable=self.statusvar, anchor='w', relief='sunken')\
+                .pack(side='bottom', fill='x')
 
         self.allfrm.pack(fill='both', expand=True, padx=1, pady=1)
-        scrl.pack(fill='both', expand=True, padx=1, pady=1)
+        self.view.pack(fill='both', expand=True, padx=1, pady=1)
         self.btnsfrm.pack(fill='x', padx=1, pady=1)
         self.previewfrm.pack(fill='x', padx=1, pady=1)
+        self.preview_label.pack(padx=3, pady=3)
+        # wheel zooms, dragging pans, double click shows everything again
+        self.preview_label.bind('<ButtonPress-1>', self.on_preview_press)
+        self.preview_label.bind('<B1-Motion>', self.on_preview_drag)
+        self.preview_label.bind('<Double-Button-1>', lambda *_: self.set_preview_view(None))
+        self.preview_label.bind('<Enter>', self.on_preview_enter)
+        self.preview_label.bind('<Leave>', self.on_preview_leave)
 
         self.bind('<Control-Return>', lambda *_: self.save())
         self.focus()
+        # set up matplotlib in the background once the window is shown
+        self.after_idle(self.renderer.start)
+        if name is not None: self.open_timeline(name)
+        if import_path is not None: self.after_idle(self.import_file, import_path)
 
 
     def build_structure(self):       
@@ -68,66 +116,201 @@ class TimelineEditor(tk.Tk):
         ttk.Separator(self.allfrm).pack(fill='x', padx=1, pady=1)
         
         # entries for start/end entering
-        startendfrm = ttk.Frame(self.workfrm)
-        startendfrm.grid(row=self.curr_row, column=0, columnspan=3,
-                         padx=1, pady=1, sticky='ew')
+        self.startendfrm.pack(fill='x', padx=1, pady=1)
         self.startstrvar = tk.StringVar(self)
         self.endstrvar = tk.StringVar(self)
-        ttk.Label(startendfrm, text='Start:    ')\
+        self.namevar = tk.StringVar(self)
+        ttk.Label(self.startendfrm, text='Start:    ')\
             .grid(row=0, column=0, padx=1, pady=1)
-        ttk.Entry(startendfrm, textvariable=self.startstrvar)\
+        ttk.Entry(self.startendfrm, textvariable=self.startstrvar)\
             .grid(row=0, column=1, padx=1, pady=1)
-        ttk.Label(startendfrm, text='Ende:    ')\
+        ttk.Label(self.startendfrm, text='Ende:    ')\
             .grid(row=1, column=0, padx=1, pady=1)
-        ttk.Entry(startendfrm, textvariable=self.endstrvar)\
+        ttk.Entry(self.startendfrm, textvariable=self.endstrvar)\
             .grid(row=1, column=1, padx=1, pady=1)
+        ttk.Label(self.startendfrm, text='Objekt:    ')\
+            .grid(row=2, column=0, padx=1, pady=1)
+        ttk.Entry(self.startendfrm, textvariable=self.namevar)\
+            .grid(row=2, column=1, padx=1, pady=1)
         
-        self.curr_row += 1
-        ttk.Separator(self.workfrm).grid(row=self.curr_row, column=0, columnspan=3,
-                                         padx=1, pady=1, sticky='ew')
-        self.curr_row += 1
-        
-        # make header
-        ttk.Label(self.workfrm, text='Titel')\
-            .grid(row=self.curr_row, column=self.name_col, padx=1, pady=1, sticky='w')
-        ttk.Label(self.workfrm, text='Intervall')\
-            .grid(row=self.curr_row, column=self.interval_col, padx=1, pady=1, sticky='w')
-        ttk.Label(self.workfrm, text='Daten')\
-            .grid(row=self.curr_row, column=self.dates_col, padx=1, pady=1, sticky='w')
-        self.workfrm.grid_columnconfigure(self.dates_col, weight=100)
-
-        # lines for dates entering
-        self.curr_row += 1
-        self.lines.append(single_timeLine(self, self.curr_row))
-        self.curr_row += 1
+        ttk.Separator(self.allfrm).pack(fill='x', padx=1, pady=1)
 
         ttk.Button(self.btnsfrm, text='OK', command=self.save)\
             .pack(side='right', padx=1, pady=1)
         ttk.Button(self.btnsfrm, text='Vorschau', command=self.display_preview)\
             .pack(side='right', padx=1, pady=1)
-
-    def add_newline_if_full(self, *_):
-        for line in self.lines:
-            if not line.get_title(): return
-        self.lines.append(single_timeLine(self, self.curr_row))
-        self.curr_row += 1
+        ttk.Button(self.btnsfrm, text='Importieren...', command=self.import_file)\
+            .pack(side='left', padx=1, pady=1)
+        # shown while importing
+        self.importvar = tk.StringVar(self)
+        self.import_progress = ttk.Progressbar(self.btnsfrm, maximum=1, length=200)
+        self.import_label = ttk.Label(self.btnsfrm, textvariable=self.importvar)
+
+    def set_title(self, index, title):
+        '''sets the title of line index, adds an empty line once all lines
+        have a title'''
+        line = self.lines[index]
+        self.n_untitled += (not title.strip()) - (not line.title.strip())
+        line.set_title(title)
+        if self.n_untitled: return
+        self.lines.append(LineData())
+        self.n_untitled += 1
+        self.view.refresh()
+
+    def set_date(self, index, i, date):
+        '''sets date i of line index, refreshes the view if a date cell was
+        added'''
+        line = self.lines[index]
+        if not line.set_date(i, date): return
+        self.max_dates = max(self.max_dates, len(line.dates))
+        self.view.refresh()
+
+    def recount(self):
+        '''recomputes the counts after self.lines was changed as a whole'''
+        self.n_untitled = sum(1 for line in self.lines if not line.title.strip())
+        self.max_dates = max(len(line.dates) for line in self.lines)
+
+    def open_timeline(self, name):
+        '''fills the editor with a timeline from the store'''
+        timelines = self.store.load([name]) if self.store is not None else []
+        if not timelines:
+            ErrorWindow(self, f'Zeitstrahl {name} nicht in der Datenbank gefunden.')
+            self.namevar.set(name)
+            return
+        timeline = timelines[0]
+        self.namevar.set(timeline.name)
+        self.startstrvar.set(ordinal2monthyear(timeline.start))
+        self.endstrvar.set(ordinal2monthyear(timeline.end))
+        self.lines = [LineData()]
+        self.add_lines(list(timeline))
+
+    def add_lines(self, rows):
+        '''adds TimelineRows as prefilled lines in front of the empty last line'''
+        self.lines[-1:-1] = [LineData.from_row(row) for row in rows]
+        self.recount()
+        self.view.refresh()
+
+    def import_file(self, path=None):
+        '''imports the entries of a logbook export (see read_logbook) as
+        prefilled lines, entries with the title of an existing line are added
+        to it. The file is read in chunks between Tk events, so the window
+        stays usable, and skipped entries are reported once at the end'''
+        if self.importer is not None: return
+        if path is None:
+            path = filedialog.askopenfilename(filetypes=[("Logbuch-Export", "*.csv *.xlsx"),
+                                                         ("CSV", "*.csv"), ("Excel", "*.xlsx")],
+                                              title="Importieren...")
+        if not path: return
+        self.importer = read_logbook(path)
+        self.import_errors = []
+        self.import_count = 0
+        self.import_range = None        # (first, last) imported month ordinal
+        self.import_index = {line.title.strip(): i for i, line in enumerate(self.lines)
+                             if line.title.strip()}
+        self.import_progress['value'] = 0
+        self.importvar.set('Importiere...')
+        self.import_progress.pack(side='left', padx=1, pady=1)
+        self.import_label.pack(side='left', padx=1, pady=1)
+        self.after_idle(self.import_next_chunk)
+
+    def import_next_chunk(self):
+        try:
+            with tracer.span('import.chunk'): rows, errors, progress = next(self.importer)
+        except StopIteration:
+            self.end_import()
+            return
+        except Exception as e:
+            self.import_errors.append(f'{type(e).__name__}: {e}')
+            self.end_import()
+            return
+        new_lines = []
+        for row in rows:
+            if len(row.dates):
+                lo, hi = int(row.dates.min()), int(row.dates.max())
+                if self.import_range is not None:
+                    lo, hi = min(lo, self.import_range[0]), max(hi, self.import_range[1])
+                self.import_range = (lo, hi)
+            index = self.import_index.get(row.title)
+            if index is None:
+                self.import_index[row.title] = len(self.lines) - 1 + len(new_lines)
+                line = LineData.from_row(row)
+                new_lines.append(line)
+            else:
+                line = self.lines[index]
+                line.add_dates(row.date_strs())
+                if not line.interval.strip() and row.interval is not None:
+                    line.set_interval(str(row.interval))
+            self.max_dates = max(self.max_dates, len(line.dates))
+        # in front of the empty last line
+        self.lines[-1:-1] = new_lines
+        self.import_count += sum(len(row.dates) for row in rows)
+        self.import_errors.extend(errors)
+        self.import_progress['value'] = progress
+        self.importvar.set(f'{self.import_count} Daten importiert')
+        self.view.refresh()
+        self.after(self.import_chunk_after, self.import_next_chunk)
+
+    def end_import(self):
+        self.importer = None
+        self.import_progress.pack_forget()
+        self.import_label.pack_forget()
+        self.view.refresh()
+        if self.import_range is not None:
+            if not self.startstrvar.get().strip():
+                self.startstrvar.set(ordinal2monthyear(self.import_range[0]))
+            if not self.endstrvar.get().strip():
+                self.endstrvar.set(ordinal2monthyear(self.import_range[1]))
+        if self.import_errors:
+            # one report, the whole list goes to stderr
+            print('\n'.join(self.import_errors), file=sys.stderr)
+            shown = self.import_errors[:self.max_import_errors]
+            more = len(self.import_errors) - len(shown)
+            ErrorWindow(self, f'{self.import_count} Daten importiert, {len(self.import_errors)} Fehler:\n'
+                              + '\n'.join(shown) + (f'\n... und {more} weitere' if more else ''))
+        self.display_preview()
+
+    def get_row(self, index):
+        '''validates line index and returns it as TimelineRow, None if it has
+        no dates. Lines that were not edited since return their last row'''
+        line = self.lines[index]
+        if line.row is not None: return line.row
+        if not line.has_dates(): return None
+        title = line.title.strip()
+        if not title:
+            ErrorWindow(self,
+                        'Alle Titel bei eingetragenen Daten müssen ausgefüllt sein.',
+                        lambda: self.view.focus_cell(index, 'title'))
+            raise ValueError('Title can\'t be empty.')
+        try: interval = parse_interval(line.interval)
+        except ValueError as e:
+            ErrorWindow(self,
+                f'Intervall muss zahlwertig oder leer sein ({title}).',
+                lambda: self.view.focus_cell(index, 'interval'))
+            raise e
+        # the dates were parsed as they were typed
+        for col, ordinal in enumerate(line.ordinals):
+            if not isinstance(ordinal, ValueError): continue
+            ErrorWindow(self,
+                        (f'Fehler beim Konvertieren von {line.dates[col].strip()} zu einem Datum. '
+                         'Ist das Format mm/yy (z. B. 05/21)?\n'
+                         f'Fehlernachricht: {ordinal}'),
+                        lambda: self.view.focus_cell(index, col))
+            raise ValueError(str(ordinal))
+        line.row = TimelineRow(title, [o for o in line.ordinals if o is not None], interval)
+        return line.row
     
-    def get_timeline_dict(self):
-        _, end = self.get_startend()
-        end = monthyear2datetime(end)
-        tl_dict = {}
-        for line in self.lines:
-            if not line.has_dates(): continue
-            title = line.get_title(empty_allowed=False)
-            dates = line.get_dateslist()
-            for i, datestr in enumerate(dates):
-                if i == 0 and isinstance(dates[0], int): continue 
-                date = monthyear2datetime(datestr)
-                if date > end:
-                    dates.remove(datestr)
-                    ErrorWindow(self, f'{title}: Datum {datestr} wird ignoriert (neuer als Enddatum).')
-            tl_dict[title] = dates
-        return tl_dict
+    def get_timeline(self):
+        '''collects all lines with dates into a Timeline. Dates newer than the
+        end are dropped with a note'''
+        start, end = self.get_startend()
+        if not start or not end: raise ValueError('Bitte Start und Ende angeben')
+        rows = [row for i in range(len(self.lines)) if (row := self.get_row(i)) is not None]
+        name = self.namevar.get().strip() or 'timeline'
+        timeline, dropped = Timeline.from_rows(rows, start, end, name).clipped()
+        if dropped:
+            ErrorWindow(self, '\n'.join(f'{title}: Datum {ordinal2monthyear(date)} wird ignoriert (neuer als Enddatum).'
+                                        for title, date in dropped))
+        return timeline
     
     def get_startend(self):
         def get_single(what='start'):
@@ -137,7 +320,7 @@ class TimelineEditor(tk.Tk):
 
             if not (txt := strvar.get().strip()): return txt
             # test for right format
-            monthyear2datetime(txt)
+            monthyear2ordinal(txt)
             return txt
         return get_single('start'), get_single('end')
     
@@ -152,191 +335,241 @@ class TimelineEditor(tk.Tk):
         if not start or not end:
             ErrorWindow(self, 'Bitte Start und Ende angeben')
             return
-        try: tl_dict = self.get_timeline_dict()
+        try: timeline = self.get_timeline()
         except Exception as e:
             ErrorWindow(self, f'Zeitstrahlfehler: {e}')
             return
                 
-        if len(tl_dict) == 0: self.destroy()
-        self.save_timeline()
+        if len(timeline) == 0:
+            self.destroy()
+            return
+        if not self.save_timeline(timeline): return
+        if self.store is not None:
+            try: self.store.save([timeline])
+            except Exception as e:
+                ErrorWindow(self, f'Fehler beim Speichern in der Datenbank: {e}')
+                return
         self.destroy()
-        sys.exit()
 
     def display_preview(self, *_):
-        self.in_displaying = True
-        curr_focus = self.focus_get()
-        delete_children(self.previewfrm)
-        fig = self.get_figure()
-        canvas = FigureCanvasTkAgg(fig, master=self.previewfrm)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True, padx=3, pady=3)
-        self.update()
-        try: curr_focus.focus()
-        except AttributeError: pass
-        self.in_displaying = False
-
-    def save_timeline(self, name='timeline'):
-        '''saves the timeline figure in a selectable selected folder'''
-        fig = self.get_figure()
-        path = filedialog.asksaveasfilename(defaultextension=".png",
-                                            filetypes=[("PNG Image", "*.png")],
-                                            initialfile='timeline',
-                                            title="Speichern unter...")
-         
-        fig.savefig(path, dpi=300)
-    
-    def get_figure(self):
-        '''return pyplot figure showing the timeline'''
+        '''renders the preview once there was no new request for
+        preview_delay ms, so quick edits lead to a single render'''
+        if self.preview_after is not None: self.after_cancel(self.preview_after)
+        self.preview_after = self.after(self.preview_delay, self.render_preview)
 
-        timeline_data, start, end = self.get_timeline_dict(), *self.get_startend()
-
-        if self.figure: plt.close(self.figure)
-
-        mpl.rcParams['font.sans-serif'] = 'Arial'
-        mpl.rcParams['font.family'] = 'sans-serif'
-        for fontsize in ['font.size', 'axes.titlesize',
-                        'axes.labelsize', 'xtick.labelsize']:
-            plt.rcParams.update({fontsize: 11})
-
-
-        keys = list(timeline_data.keys())
-        nrows = len(keys)
-
-        # Convert start and end dates to datetime objects
-        start_date = datetime.strptime(start, '%m/%y')
-        end_date = datetime.strptime(end, '%m/%y')
-
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=(5.5, .5+nrows/3), layout='constrained')    
-        # format axis
-        ax.spines[['top', 'left', 'right', 'bottom']].set_visible(False)
-        # Assign y positions to each key
-        y_positions = list(range(nrows))
-        ax.set_yticks(y_positions)
-        ax.set_ylim([-nrows/10, y_positions[-1]+nrows/10])
-        ax.set_yticklabels([key.replace('|', '\n') for key in keys])
-        ax.invert_yaxis()  # Top key first
-        ax.tick_params(axis='y', which='both', length=0)
-
-        # Set x-axis limits and format
-        datespan = (end_date-start_date).days / 30 # months
-        ax.set_xlim(start_date-relativedelta(months=1), end_date+relativedelta(months=round(datespan/20)))
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%y'))
-        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-        ax.tick_params(axis='x', which='both', direction='inout', length=6, labelrotation=45)
+    def render_preview(self):
+        self.preview_after = None
+        try:
+            with tracer.span('preview.timeline'): timeline = self.get_timeline()
+        except Exception as e:
+            print(e)
+            return
+        # a zoomed view doesn't fit another start/end
+        if self.curr_tl is not None and \
+                (self.curr_tl.start, self.curr_tl.end) != (timeline.start, timeline.end):
+            self.preview_view = None
+        self.curr_tl = timeline
+        # figure building and drawing happen on the renderer's thread
+        self.renderer.submit(timeline, self.preview_view)
+
+    def set_preview_view(self, view):
+        '''zooms the preview to view (x limits in date numbers), shows the
+        whole timeline for None. Renders right away, without preview_delay'''
+        self.preview_view = view
+        if self.curr_tl is not None: self.renderer.submit(self.curr_tl, view)
+
+    def preview_xdata(self, x):
+        '''date number at x pixels of the preview label'''
+        x0, x1, (xmin, xmax), _ = self.preview_geometry
+        # the image is centered in the label
+        x -= (self.preview_label.winfo_width() - self.preview_image.width()) / 2
+        return xmin + (x - x0) / (x1 - x0) * (xmax - xmin)
+
+    def clamp_preview_view(self, xmin, xmax):
+        '''view of width xmax-xmin moved into the timeline, None if it
+        covers the whole timeline'''
+        lo, hi = self.preview_geometry[3]
+        if xmax - xmin >= hi - lo: return None
+        shift = max(lo - xmin, 0) - max(xmax - hi, 0)
+        return (xmin + shift, xmax + shift)
+
+    def zoom_preview(self, x, factor):
+        '''zooms the preview by factor (< 1 zooms in) around x pixels'''
+        if self.preview_geometry is None: return
+        xmin, xmax = self.preview_geometry[2]
+        center = self.preview_xdata(x)
+        # show at least about two months
+        factor = max(factor, 60 / (xmax - xmin))
+        self.set_preview_view(self.clamp_preview_view(center - (center - xmin) * factor,
+                                                      center + (xmax - center) * factor))
+
+    def on_preview_press(self, event):
+        self.preview_drag = (event.x, self.preview_view)
+
+    def on_preview_drag(self, event):
+        if self.preview_drag is None or self.preview_drag[1] is None: return
+        x, (xmin, xmax) = self.preview_drag
+        x0, x1 = self.preview_geometry[:2]
+        shift = (x - event.x) / (x1 - x0) * (xmax - xmin)
+        self.set_preview_view(self.clamp_preview_view(xmin + shift, xmax + shift))
+
+    def on_preview_wheel(self, event):
+        if platform.system() == 'Linux': zoom_in = event.num == 4
+        else: zoom_in = event.delta > 0
+        self.zoom_preview(event.x, .8 if zoom_in else 1.25)
+
+    def on_preview_enter(self, event):
+        if platform.system() == 'Linux':
+            self.bind_all("<Button-4>", self.on_preview_wheel)
+            self.bind_all("<Button-5>", self.on_preview_wheel)
+        else:
+            self.bind_all("<MouseWheel>", self.on_preview_wheel)
 
-        # Custom x-ticks handling    
-        # Get potential ticks then filter
-        raw_ticks = mdates.AutoDateLocator().tick_values(start_date, end_date)
-        min_distance = round(datespan*1.5)  # Minimum days between edge ticks and first/last interior ticks
-        
-        # Convert to datetime and filter
-        filtered_ticks = []
-        for tick in raw_ticks:
-            tick_date = mdates.num2date(tick).replace(tzinfo=None)
-            if tick_date < start_date or tick_date > end_date:
-                continue
-                
-            # Check proximity to edges
-            days_from_start = (tick_date - start_date).days
-            days_from_end = (end_date - tick_date).days
-            
-            # Always keep start/end dates
-            if days_from_start == 0 or days_from_end == 0:
-                filtered_ticks.append(tick_date)
-                continue
-                
-            # Filter nearby ticks
-            if days_from_start > min_distance and days_from_end > min_distance:
-                filtered_ticks.append(tick_date)
-        
-        # Ensure start/end are always included
-        filtered_dates = [start_date, end_date] + [
-            t for t in filtered_ticks 
-            if t not in {start_date, end_date}
-        ]
-        filtered_dates.sort()
-
-        ax.xaxis.set_major_locator(FixedLocator(mdates.date2num(filtered_dates)))
-        ax.tick_params(axis='x', which='both', direction='inout', length=6, labelrotation=45)
+    def on_preview_leave(self, event):
+        if platform.system() == 'Linux':
+            self.unbind_all("<Button-4>")
+            self.unbind_all("<Button-5>")
+        else:
+            self.unbind_all("<MouseWheel>")
 
+    def show_preview(self, rgba, error=None, geometry=None, scale=1):
+        '''copies a rendered preview into the preview image, drafts are
+        shown enlarged by scale'''
+        if error is not None:
+            print(error)
+            return
+        self.preview_geometry = geometry
+        from matplotlib.backends._backend_tk import blit
+        with tracer.span('preview.blit'):
+            height, width = rgba.shape[:2]
+            attr = 'draft_image' if scale > 1 else 'full_image'
+            image = getattr(self, attr)
+            if image is None or (image.width(), image.height()) != (width, height):
+                image = tk.PhotoImage(master=self, width=width, height=height)
+                setattr(self, attr, image)
+            blit(image, rgba, (0, 1, 2, 3))
+            if scale > 1: image = image.zoom(scale)
+            if image is not self.preview_image:
+                self.preview_image = image
+                self.preview_label.configure(image=image)
+        last = tracer.last
+        self.statusvar.set(f'Letzte Vorschau: {last.get("preview.total", 0):.0f} ms,'
+                           f' Entwurf nach {last.get("preview.first", 0):.0f} ms'
+                           f' (Zeitstrahl {last.get("preview.timeline", 0):.0f} ms,'
+                           f' Aufbau {last.get("preview.update", 0):.0f} ms,'
+                           f' Entwurf {last.get("preview.draft", 0):.0f} ms,'
+                           f' Zeichnen {last.get("preview.draw", 0):.0f} ms,'
+                           f' Anzeigen {last.get("preview.blit", 0):.0f} ms)')
+
+    def save_timeline(self, timeline=None):
+        '''saves the timeline figure in a selectable selected folder. Returns
+        False if no file was selected'''
+        if timeline is None: timeline = self.get_timeline()
+        path = filedialog.asksaveasfilename(defaultextension=".png",
+                                            filetypes=[("PNG Image", "*.png"),
+                                                       ("PDF, mehrseitig", "*.pdf"),
+                                                       ("SVG, eine Datei pro Seite", "*.svg")],
+                                            initialfile=timeline.name,
+                                            title="Speichern unter...")
+        if not path: return False
+        with tracer.span('save', path=path, rows=len(timeline)):
+            if os.path.splitext(path)[1].lower() in ('.pdf', '.svg'):
+                save_pages(timeline, path, self.rows_per_page)
+                return True
+            # drawn with the preview's figure, an unchanged timeline that
+            # was saved before is not rendered again
+            data = self.renderer.export(timeline, self.render_cache, 'png', self.export_dpi)
+            with tracer.span('save.write'), open(path, 'wb') as f: f.write(data)
+        return True
+
+
+class LineData():
+    '''plain data of one editor line as typed: title, interval and date
+    strings. The last date is kept empty so there is always a cell to type
+    the next date into. Edits go through the set_* methods, which keep the
+    counts of empty and filled date cells, the parsed state of every date
+    cell (None: blank, int: month ordinal, ValueError) and drop the cached
+    TimelineRow, so a keystroke costs the same no matter how long the line is'''
+    __slots__ = ('title', 'interval', 'dates', 'ordinals', 'n_empty', 'n_filled', 'row')
+
+    def __init__(self, title: str='', interval: str='', dates=None):
+        self.title = title
+        self.interval = interval
+        self.dates = list(dates) if dates else []
+        self.ordinals = [parse_date_cell(date) for date in self.dates]
+        self.n_empty = sum(1 for date in self.dates if not date)
+        self.n_filled = sum(1 for date in self.dates if date.strip())
+        self.row = None                 # TimelineRow of the validated line
+        self.add_datecol_if_full()
 
-        # Plot each entry
-        for y_pos, key in zip(y_positions, keys):
-            entry = timeline_data[key]
-            interval = None
-            date_strs = entry
-            
-            # Check if the first element is an interval (integer)
-            if isinstance(entry[0], int):
-                interval = entry[0]
-                date_strs = entry[1:]
-            
-            # Convert date strings to datetime objects
-            dates_list = [datetime.strptime(ds, '%m/%y') for ds in date_strs]
-            
-            # Plot vertical markers
-            for date in dates_list:
-                ax.plot(date, y_pos, 'k|', markersize=8, markeredgewidth=2, zorder=3)
-            
-            # Plot blue interval lines
-            if interval is not None:
-                for date in dates_list:
-                    end_date_line = min([date + relativedelta(months=+interval),
-                                        end_date])
-                    ax.hlines(
-                        y=y_pos, xmin=date, xmax=end_date_line,
-                        colors='tab:blue', linewidth=2, alpha=0.35, zorder=2)
-        for date in [start_date, end_date]:
-            ax.axvline(date, c='tab:gray', ls='--', lw=1, zorder=1, alpha=.5)
+    @classmethod
+    def from_row(cls, row: 'TimelineRow'):
+        return cls(row.title, '' if row.interval is None else str(row.interval),
+                   row.date_strs())
+
+    def set_title(self, title: str):
+        self.title = title
+        self.row = None
+
+    def set_interval(self, interval: str):
+        self.interval = interval
+        self.row = None
+
+    def set_date(self, i: int, date: str):
+        '''returns True if a date cell was added'''
+        old = self.dates[i]
+        self.n_empty += (not date) - (not old)
+        self.n_filled += bool(date.strip()) - bool(old.strip())
+        self.dates[i] = date
+        self.ordinals[i] = parse_date_cell(date)
+        self.row = None
+        return self.add_datecol_if_full()
+
+    def add_dates(self, dates):
+        '''adds date strings in front of a trailing empty cell'''
+        at = len(self.dates) - (bool(self.dates) and not self.dates[-1])
+        self.dates[at:at] = dates
+        self.ordinals[at:at] = [parse_date_cell(date) for date in dates]
+        self.n_filled += sum(1 for date in dates if date.strip())
+        self.n_empty += sum(1 for date in dates if not date)
+        self.row = None
+
+    def add_datecol_if_full(self):
+        '''returns True if a date cell was added'''
+        if self.n_empty: return False
+        self.dates.append('')
+        self.ordinals.append(None)
+        self.n_empty += 1
+        return True
 
+    def has_dates(self):
+        return self.n_filled > 0
 
-        # add arrow as x axis
-        xmin, xmax = ax.get_xlim()
-        ymin, _ = ax.get_ylim()
-        arrow = mpatches.FancyArrowPatch(
-            (xmin, ymin), (xmax, ymin),
-            arrowstyle='-|>',
-            mutation_scale=10,
-            color='black',
-            linewidth=0.8,
-            clip_on=False
-        )
-        ax.add_patch(arrow)
-        self.figure = fig
-        return fig
-    
 
 class single_timeLine():
-    def __init__(self, master: TimelineEditor, row: int,
-                 prefill: Optional[list]=None):
-        self.master = master
+    '''widgets of one visible line of the LinesView. It is recycled while
+    scrolling and shows whatever line of the editor's data it is bound to'''
+    def __init__(self, view: 'LinesView', row: int):
+        self.view = view
+        self.master = view.editor
         self.row = row
+        self.index = None               # index in master.lines
+        self.loading = False            # True while the vars are set from the data
 
-        try: title = prefill[0]
-        except IndexError: title=None
-        except TypeError: title=None
-        self.titlevar = tk.StringVar(self.master, value=title)
-        self.titlevar.trace_add('write', self.master.add_newline_if_full)
-        
-        try: interval = int(prefill[1][0])
-        except ValueError: interval = None
-        except IndexError: interval = None
-        except TypeError: interval = None
-        self.intervalvar = tk.StringVar(self.master, value=interval)
+        self.titlevar = tk.StringVar(self.master)
+        self.titlevar.trace_add('write', self.on_title)
+        self.intervalvar = tk.StringVar(self.master)
+        self.intervalvar.trace_add('write', self.on_interval)
 
         self.datevars = []
+        self.dateentries = []
 
         # entries
-        self.titleentry = ttk.Entry(self.master.workfrm,
+        self.titleentry = ttk.Entry(self.view.rowsfrm,
                                 textvariable=self.titlevar)
-        self.intervalentry = ttk.Entry(self.master.workfrm,
+        self.intervalentry = ttk.Entry(self.view.rowsfrm,
                                     textvariable=self.intervalvar, width=4)
-        self.datesfrm = ttk.Frame(self.master.workfrm)
-        if prefill:
-            dates = prefill[1][1:] if interval else prefill[1]
-            for i, date in enumerate(dates):
-                self.add_single_datecol(i, prefill_date=date)
+        self.datesfrm = ttk.Frame(self.view.rowsfrm)
 
         self.titleentry.grid(row=self.row, column=self.master.name_col,
                              padx=1, pady=1, sticky='ew')
@@ -344,71 +577,259 @@ class single_timeLine():
                                 padx=1, pady=1, sticky='ew')
         self.datesfrm.grid(row=self.row, column=self.master.dates_col,
                            padx=1, pady=1, sticky='ew')
-
-        self.add_datecol_if_full()
-
-    def add_datecol_if_full(self, *_):
-        i = 0
-        for datevar in self.datevars:
-            if not datevar.get(): return
-            i += 1
-        self.add_single_datecol(i)
-    
-    def add_single_datecol(self, col, prefill_date: Optional[str]=None):
-        datestrvar = tk.StringVar(self.master, value=prefill_date)
-        datestrvar.trace_add('write', self.add_datecol_if_full)
+        self.bind_keys(self.titleentry, 'title')
+        self.bind_keys(self.intervalentry, 'interval')
+        self.titleentry.bind('<<PrevWindow>>', self.on_backtab)
+
+    def bind_keys(self, entry, cell):
+        '''keeps track of the focus and moves it to the line above or below
+        with the arrow keys. cell: 'title', 'interval' or the date column'''
+        get_cell = (lambda: cell) if isinstance(cell, str) else (lambda: self.view.first_date + cell)
+        entry.bind('<FocusIn>', lambda _: self.view.on_focus(self.index, get_cell()))
+        entry.bind('<Up>', lambda _: self.view.step_focus(self.index, get_cell(), -1))
+        entry.bind('<Down>', lambda _: self.view.step_focus(self.index, get_cell(), 1))
+
+    def set_ncols(self, ncols):
+        '''sets the number of date entries'''
+        while len(self.dateentries) < ncols:
+            self.add_single_datecol(len(self.dateentries))
+        while len(self.dateentries) > ncols:
+            self.dateentries.pop().destroy()
+            self.datevars.pop()
+
+    def add_single_datecol(self, col):
+        datestrvar = tk.StringVar(self.master)
+        datestrvar.trace_add('write', lambda *_: self.on_date(col))
         dateentry = ttk.Entry(self.datesfrm, textvariable=datestrvar, width=10)
         dateentry.grid(row=0, column=col, padx=1, pady=1, sticky='ew')
-        dateentry.bind('<Tab>', self.update_preview)
+        dateentry.bind('<Tab>', lambda *_: self.on_tab(col))
+        self.bind_keys(dateentry, col)
         self.datevars.append(datestrvar)
+        self.dateentries.append(dateentry)
+
+    def show(self, index: Optional[int]):
+        '''binds the widgets to line index, hides them for None'''
+        self.index = index
+        if index is None:
+            for widget in (self.titleentry, self.intervalentry, self.datesfrm):
+                widget.grid_remove()
+            return
+        line = self.master.lines[index]
+        self.loading = True
+        set_if_changed(self.titlevar, line.title)
+        set_if_changed(self.intervalvar, line.interval)
+        for col, (datevar, dateentry) in enumerate(zip(self.datevars, self.dateentries)):
+            i_date = self.view.first_date + col
+            if i_date < len(line.dates):
+                set_if_changed(datevar, line.dates[i_date])
+                dateentry.grid()
+            else:
+                set_if_changed(datevar, '')
+                dateentry.grid_remove()
+        self.loading = False
+        for widget in (self.titleentry, self.intervalentry, self.datesfrm):
+            widget.grid()
+
+    def on_title(self, *_):
+        if self.loading or self.index is None: return
+        with tracer.span('edit.title'):
+            self.master.set_title(self.index, self.titlevar.get())
+
+    def on_interval(self, *_):
+        if self.loading or self.index is None: return
+        self.master.lines[self.index].set_interval(self.intervalvar.get())
+
+    def on_date(self, col):
+        if self.loading or self.index is None: return
+        with tracer.span('edit.date'):
+            self.master.set_date(self.index, self.view.first_date + col,
+                                 self.datevars[col].get())
+
+    def on_tab(self, col):
+        self.update_preview()
+        # scroll the dates if the line continues right of the last visible cell
+        line = self.master.lines[self.index]
+        if col == len(self.dateentries)-1 and self.view.first_date + col + 1 < len(line.dates):
+            self.view.xview('scroll', 1, 'units')
+            self.dateentries[col].focus()
+            return 'break'
+        # scroll down if the next line is below the bottom row
+        if self.view.first_date + col + 1 >= len(line.dates) and self.index + 1 < len(self.master.lines) \
+                and self.index + 1 == self.view.first_line + len(self.view.rows):
+            self.view.focus_cell(self.index + 1, 'title')
+            return 'break'
+
+    def on_backtab(self, *_):
+        # scroll up if the line before is above the top row
+        if self.index == self.view.first_line and self.index > 0:
+            self.view.focus_cell(self.index - 1, len(self.master.lines[self.index - 1].dates) - 1)
+            return 'break'
 
     def update_preview(self, *_):
-        if self.master.in_displaying: return
-        try: self.master.display_preview()
-        except Exception as e: print(e)
-        finally: self.master.in_displaying = False
-
-    def get_title(self, empty_allowed=True):
-        title = self.titlevar.get().strip()
-        if empty_allowed: return title
-        if not title:
-            raise ValueError('Title can\'t be empty.')
-        return title
-    def get_dateslist(self):
-        if not self.has_dates(): return []
-        try: title = self.get_title()
-        except ValueError as e:
-            ErrorWindow(self.master,
-                        'Alle Titel bei eingetragenen Daten müssen ausgefüllt sein.',
-                        self.titleentry.focus())
-            raise e
-        interval = self.intervalvar.get().strip()
-        if interval:
-            try: interval = int(interval)
-            except ValueError as e:
-                ErrorWindow(self.master,
-                    f'Intervall muss zahlwertig oder leer sein ({title}).',
-                    self.intervalentry.focus())
-                raise e
-            ret_list = [interval]
-        else: ret_list = []
-        for datevar in self.datevars:
-            date = datevar.get().strip()
-            if not date: continue
-            try: monthyear2datetime(date)
-            except Exception as e:
-                ErrorWindow(self.master,
-                            (f'Fehler beim Konvertieren von {date} zu einem Datum. '
-                             'Ist das Format mm/yy (z. B. 05/21)?\n'
-                             f'Fehlernachricht: {e}'))
-                raise e
-            ret_list.append(date)
-        return ret_list
+        self.master.display_preview()
+
+
+class LinesView(ttk.Frame):
+    '''scrollable table of the editor lines. Only the lines and date cells
+    that fit into the frame exist as widgets (single_timeLine rows), scrolling
+    rebinds them to other lines/dates of TimelineEditor.lines instead of
+    moving a huge frame around. The keyboard focus stays with its cell
+    while scrolling, Tab and the arrow keys scroll to lines outside the view'''
+    def __init__(self, editor: TimelineEditor, parent):
+        super().__init__(parent)
+        self.editor = editor
+        self.first_line = 0             # index of the line in the top row
+        self.first_date = 0             # index of the date in the left column
+        self.ncols = 1
+        self.rows = []                  # single_timeLine widgets
+        self.focused = None             # (line index, 'title', 'interval' or date index) with the focus
+
+        # the size of rowsfrm comes from the window, not from its content.
+        # Otherwise new rows would make the window grow and ask for even more rows
+        self.rowsfrm = ttk.Frame(self, width=800, height=250)
+        self.rowsfrm.grid_propagate(False)
+        self.vsb = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.hsb = ttk.Scrollbar(self, orient='horizontal', command=self.xview)
+        self.rowsfrm.grid(row=0, column=0, sticky='nsew')
+        self.vsb.grid(row=0, column=1, sticky='ns')
+        self.hsb.grid(row=1, column=0, sticky='ew')
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
 
-    def has_dates(self):
-        for datevar in self.datevars:
-            if datevar.get().strip(): return True
-        return False
+        # make header
+        header = ttk.Label(self.rowsfrm, text='Titel')
+        header.grid(row=0, column=editor.name_col, padx=1, pady=1, sticky='w')
+        ttk.Label(self.rowsfrm, text='Intervall')\
+            .grid(row=0, column=editor.interval_col, padx=1, pady=1, sticky='w')
+        ttk.Label(self.rowsfrm, text='Daten')\
+            .grid(row=0, column=editor.dates_col, padx=1, pady=1, sticky='w')
+        self.rowsfrm.grid_columnconfigure(editor.dates_col, weight=100)
+
+        self.header_height = header.winfo_reqheight() + 2
+        self.set_size(1, 1)
+        self.rowsfrm.bind('<Configure>', self.onFrameConfigure)
+        self.rowsfrm.bind('<Enter>', self.onEnter)
+        self.rowsfrm.bind('<Leave>', self.onLeave)
+
+    def onFrameConfigure(self, event):
+        '''creates or destroys line widgets to fill the new size'''
+        proto = self.rows[0]
+        row_height = proto.dateentries[0].winfo_reqheight() + 4
+        date_width = proto.dateentries[0].winfo_reqwidth() + 2
+        fixed_width = (proto.titleentry.winfo_reqwidth()
+                       + proto.intervalentry.winfo_reqwidth() + 8)
+        self.set_size(max(1, (event.height - self.header_height) // row_height),
+                      max(1, (event.width - fixed_width) // date_width))
+
+    def set_size(self, nrows, ncols):
+        if (nrows, ncols) == (len(self.rows), self.ncols): return
+        while len(self.rows) < nrows:
+            self.rows.append(single_timeLine(self, len(self.rows)+1))
+        while len(self.rows) > nrows:
+            row = self.rows.pop()
+            for widget in (row.titleentry, row.intervalentry, row.datesfrm):
+                widget.destroy()
+        self.ncols = ncols
+        for row in self.rows: row.set_ncols(ncols)
+        self.refresh()
+
+    def refresh(self):
+        '''rebinds all visible rows to the data and updates the scrollbars'''
+        lines = self.editor.lines
+        max_dates = self.editor.max_dates
+        self.first_line = max(0, min(self.first_line, len(lines) - len(self.rows)))
+        self.first_date = max(0, min(self.first_date, max_dates - self.ncols))
+        for i, row in enumerate(self.rows):
+            index = self.first_line + i
+            row.show(index if index < len(lines) else None)
+        self.vsb.set(self.first_line / len(lines),
+                     min(1, (self.first_line + len(self.rows)) / len(lines)))
+        self.hsb.set(self.first_date / max_dates,
+                     min(1, (self.first_date + self.ncols) / max_dates))
+        # the focus follows its cell, while that is out of view the frame
+        # holds it so the keystrokes don't edit another line
+        if self.focused is not None and self.has_focus():
+            (self.cell_widget(*self.focused) or self.rowsfrm).focus_set()
+
+    def has_focus(self):
+        '''True if the focus is on rowsfrm or one of its entries'''
+        try: widget = self.focus_get()
+        except KeyError: return False   # focus_get fails for ttk popdowns
+        return widget is not None and (str(widget) + '.').startswith(str(self.rowsfrm) + '.')
+
+    def cell_widget(self, index, col):
+        '''entry of the 'title', 'interval' or date index col of line
+        index, None if it is out of view'''
+        i = index - self.first_line
+        if not 0 <= i < len(self.rows) or self.rows[i].index != index: return None
+        row = self.rows[i]
+        if col == 'title': return row.titleentry
+        if col == 'interval': return row.intervalentry
+        if not self.first_date <= col < self.first_date + self.ncols \
+                or col >= len(self.editor.lines[index].dates): return None
+        return row.dateentries[col - self.first_date]
+
+    def on_focus(self, index, col):
+        if index is not None: self.focused = (index, col)
+
+    def step_focus(self, index, col, step):
+        '''moves the focus to the same cell of the line step lines away'''
+        if index is None or not 0 <= index + step < len(self.editor.lines): return 'break'
+        self.focus_cell(index + step, col)
+        return 'break'
+
+    def scroll(self, what, total, page, *args):
+        '''translates scrollbar commands to the new first index'''
+        first = getattr(self, what)
+        if args[0] == 'moveto': first = round(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            first += int(args[1]) * (page if args[2] == 'pages' else 1)
+        setattr(self, what, first)
+        self.refresh()
+
+    def yview(self, *args):
+        self.scroll('first_line', len(self.editor.lines), len(self.rows), *args)
+
+    def xview(self, *args):
+        self.scroll('first_date', self.editor.max_dates,
+                    self.ncols, *args)
+
+    def focus_cell(self, index, col):
+        '''scrolls line index into view and focuses its 'title', 'interval' or
+        date number col (its last date if it has fewer)'''
+        self.first_line = min(max(self.first_line, index - len(self.rows) + 1), index)
+        if isinstance(col, int):
+            col = min(col, len(self.editor.lines[index].dates) - 1)
+            self.first_date = min(max(self.first_date, col - self.ncols + 1), col)
+        self.focused = (index, col)
+        self.refresh()
+        self.cell_widget(index, col).focus()
+
+    def onMouseWheel(self, event):                                                  # cross platform scroll wheel event
+        func = self.xview if event.state & 0x1 else self.yview                      # shift scrolls the dates
+        if platform.system() == 'Windows':
+            func('scroll', int(-1*(event.delta/120)), 'units')
+        elif platform.system() == 'Darwin':
+            func('scroll', int(-1 * event.delta), 'units')
+        else:
+            if event.num == 4:
+                func('scroll', -1, 'units')
+            elif event.num == 5:
+                func('scroll', 1, 'units')
+
+    def onEnter(self, event):                                                       # bind wheel events when the cursor enters the control
+        if platform.system() == 'Linux':
+            self.bind_all("<Button-4>", self.onMouseWheel)
+            self.bind_all("<Button-5>", self.onMouseWheel)
+        else:
+            self.bind_all("<MouseWheel>", self.onMouseWheel)
+
+    def onLeave(self, event):                                                       # unbind wheel events when the cursorl leaves the control
+        if platform.system() == 'Linux':
+            self.unbind_all("<Button-4>")
+            self.unbind_all("<Button-5>")
+        else:
+            self.unbind_all("<MouseWheel>")
 
 
 class ErrorWindow(tk.Toplevel):
@@ -436,116 +857,1934 @@ class ErrorWindow(tk.Toplevel):
         self.destroy()
 
 
-class ScrollFrame(tk.Frame):
-    def __init__(self, parent, orient='vertical', use_mousewheel=True,
-                 def_height=None, def_width=None):
-        super().__init__(parent) # create a frame (self)
-        
-        self.orient = orient
-        self.canvas = tk.Canvas(self, borderwidth=0, 
-                                height=def_height, width=def_width)                     #place canvas on self
-        self.viewPort = ttk.Frame(self.canvas)                                           #place a frame on the canvas, this frame will hold the child widgets 
-
-        if self.orient == 'vertical':
-            self.vsb = tk.Scrollbar(self, orient=orient, command=self.canvas.yview)     #place a scrollbar on self 
-            self.canvas.configure(yscrollcommand=self.vsb.set)                          #attach scrollbar action to scroll of canvas
-
-            self.vsb.pack(side="right", fill="y")                                       #pack scrollbar to right of self
-            self.canvas.pack(side="right", fill="both", expand=True)                     #pack canvas to left of self and expand to fil
-
-        elif orient == 'horizontal':
-            self.hsb = tk.Scrollbar(self, orient=orient, command=self.canvas.xview) #place a scrollbar on self 
-            self.canvas.configure(xscrollcommand=self.hsb.set)                          #attach scrollbar action to scroll of canvas
-
-            self.hsb.pack(side="bottom", fill="x")                                       #pack scrollbar to right of self
-            self.canvas.pack(side="left", fill="both", expand=True)                     #pack canvas to left of self and expand to fil
-
+class TimelineRow():
+    '''one work item of a timeline: title, interval in months (None for no
+    interval bars) and its dates as int64 month ordinals. Dates may be given
+    as mm/yy strings or as month ordinals'''
+    __slots__ = ('title', 'interval', 'dates')
+
+    def __init__(self, title: str, dates=(), interval: Optional[int]=None):
+        self.title = title.strip()
+        if not self.title: raise ValueError('Title can\'t be empty.')
+        self.interval = parse_interval(interval)
+        dates = list(dates) if not isinstance(dates, np.ndarray) else dates
+        if len(dates) and isinstance(dates[0], str): self.dates = monthyears2ordinals(dates)
+        else: self.dates = np.asarray(dates, dtype=np.int64)
+
+    def __eq__(self, other):
+        return (isinstance(other, TimelineRow) and self.title == other.title
+                and self.interval == other.interval
+                and np.array_equal(self.dates, other.dates))
+
+    def __repr__(self):
+        return f'TimelineRow({self.title!r}, {self.date_strs()}, interval={self.interval})'
+
+    def date_strs(self):
+        return [ordinal2monthyear(o) for o in self.dates]
+
+
+class Timeline():
+    '''all rows of a timeline plus its start and end (month ordinals). The
+    dates of all rows are stored in one contiguous int64 array, row i owns
+    dates[offsets[i]:offsets[i+1]]. Intervals are stored as int64 array with
+    NO_INTERVAL for rows without interval bars. The data is validated once on
+    construction, use from_rows/from_dict to build it from other formats'''
+    __slots__ = ('name', 'start', 'end', 'titles', 'intervals', 'offsets', 'dates',
+                 '_digest')
+    NO_INTERVAL = -1
+
+    def __init__(self, titles, intervals, offsets, dates, start, end,
+                 name: str='timeline'):
+        self.name = name
+        self.start = monthyear2ordinal(start) if isinstance(start, str) else int(start)
+        self.end = monthyear2ordinal(end) if isinstance(end, str) else int(end)
+        self.titles = list(titles)
+        self.intervals = np.asarray(intervals, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.dates = np.asarray(dates, dtype=np.int64)
+        self._digest = None
+        self.validate()
+
+    def validate(self):
+        n = len(self.titles)
+        if self.start > self.end:
+            raise ValueError('Start muss vor dem Ende liegen.')
+        if len(self.intervals) != n or len(self.offsets) != n+1:
+            raise ValueError(f'{n} Titel, aber {len(self.intervals)} Intervalle und {len(self.offsets)-1} Zeilen')
+        if self.offsets[0] != 0 or self.offsets[-1] != len(self.dates) \
+                or np.any(np.diff(self.offsets) < 0):
+            raise ValueError('offsets passen nicht zu den Daten')
+        if np.any(self.intervals < self.NO_INTERVAL):
+            raise ValueError('Intervall darf nicht negativ sein.')
+        for title in self.titles:
+            if not title.strip(): raise ValueError('Title can\'t be empty.')
+
+    @classmethod
+    def from_rows(cls, rows, start, end, name: str='timeline'):
+        rows = list(rows)
+        counts = [len(row.dates) for row in rows]
+        return cls([row.title for row in rows],
+                   [cls.NO_INTERVAL if row.interval is None else row.interval for row in rows],
+                   np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]),
+                   np.concatenate([row.dates for row in rows] + [np.empty(0, dtype=np.int64)]),
+                   start, end, name)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, i):
+        interval = int(self.intervals[i])
+        return TimelineRow(self.titles[i], self.dates[self.offsets[i]:self.offsets[i+1]],
+                           None if interval == self.NO_INTERVAL else interval)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __eq__(self, other):
+        return (isinstance(other, Timeline) and self.name == other.name
+                and (self.start, self.end) == (other.start, other.end)
+                and self.titles == other.titles
+                and np.array_equal(self.intervals, other.intervals)
+                and np.array_equal(self.offsets, other.offsets)
+                and np.array_equal(self.dates, other.dates))
+
+    def __repr__(self):
+        return (f'Timeline({self.name!r}, {ordinal2monthyear(self.start)}-'
+                f'{ordinal2monthyear(self.end)}, {len(self)} rows, {len(self.dates)} dates)')
+
+    def digest(self):
+        '''stable hash (bytes) of everything that gets drawn, i.e. all but the name'''
+        if self._digest is None:
+            h = hashlib.blake2b(digest_size=20)
+            h.update(json.dumps([self.start, self.end, self.titles]).encode())
+            for arr in (self.intervals, self.offsets, self.dates):
+                h.update(arr.astype('<i8', copy=False).tobytes())
+            self._digest = h.digest()
+        return self._digest
+
+    def row_index(self):
+        '''row number of every entry in dates'''
+        return np.repeat(np.arange(len(self)), np.diff(self.offsets))
+
+    def col_index(self):
+        '''position of every entry in dates within its row'''
+        return np.arange(len(self.dates)) - np.repeat(self.offsets[:-1], np.diff(self.offsets))
+
+    def clipped(self):
+        '''returns (timeline without dates newer than end, [(title, ordinal),
+        ...] of the dropped dates)'''
+        keep = self.dates <= self.end
+        if keep.all(): return self, []
+        rows = self.row_index()
+        dropped = [(self.titles[r], int(d)) for r, d in zip(rows[~keep], self.dates[~keep])]
+        counts = np.bincount(rows[keep], minlength=len(self))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return Timeline(self.titles, self.intervals, offsets, self.dates[keep],
+                        self.start, self.end, self.name), dropped
+
+    def row_slice(self, lo: int, hi: int):
+        '''timeline with rows lo to hi (exclusive), same start and end'''
+        lo, hi, _ = slice(lo, hi).indices(len(self))
+        offsets = self.offsets[lo:max(lo, hi)+1]
+        return Timeline(self.titles[lo:hi], self.intervals[lo:hi], offsets - offsets[0],
+                        self.dates[offsets[0]:offsets[-1]], self.start, self.end, self.name)
+
+    def pages(self, rows_per_page: int):
+        '''yields the timeline split into parts of rows_per_page rows'''
+        for lo in range(0, max(len(self), 1), rows_per_page):
+            yield self.row_slice(lo, lo+rows_per_page)
+
+    # serialization
+    def to_dict(self):
+        return {'name': self.name,
+                'start': ordinal2monthyear(self.start),
+                'end': ordinal2monthyear(self.end),
+                'rows': [{'title': row.title, 'interval': row.interval,
+                          'dates': row.date_strs()} for row in self]}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        '''builds a timeline from {"name", "start", "end", "rows": [{"title",
+        "interval", "dates"}]}, dates as a list of mm/yy strings'''
+        rows = []
+        for row in data['rows']:
+            dates = row.get('dates', [])
+            # TimelineRow would take numbers as month ordinals and a string as its characters
+            if not isinstance(dates, list) or not all(isinstance(date, str) for date in dates):
+                raise ValueError(f'Daten müssen eine Liste von mm/yy-Strings sein, nicht {dates!r}')
+            rows.append(TimelineRow(row['title'], dates, row.get('interval')))
+        return cls.from_rows(rows, data['start'].strip(), data['end'].strip(),
+                             data.get('name', 'timeline'))
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @classmethod
+    def from_json(cls, text: str):
+        return cls.from_dict(json.loads(text))
+
+    def to_numpy(self):
+        '''dict of numpy arrays (no copies of the date columns), e.g. for
+        np.savez'''
+        return {'name': np.array(self.name), 'start': np.array(self.start),
+                'end': np.array(self.end), 'titles': np.array(self.titles, dtype=str),
+                'intervals': self.intervals, 'offsets': self.offsets,
+                'dates': self.dates}
+
+    @classmethod
+    def from_numpy(cls, arrays):
+        return cls(arrays['titles'].tolist(), arrays['intervals'], arrays['offsets'],
+                   arrays['dates'], int(arrays['start']), int(arrays['end']),
+                   str(arrays['name']))
+
+    def to_arrow(self):
+        '''pyarrow table with one line per row, the dates column is a large
+        list array on top of the offsets and dates buffers'''
+        import pyarrow as pa
+        interval_mask = self.intervals == self.NO_INTERVAL
+        return pa.table(
+            {'title': pa.array(self.titles, type=pa.string()),
+             'interval': pa.array(self.intervals, mask=interval_mask),
+             'dates': pa.LargeListArray.from_arrays(pa.array(self.offsets),
+                                                    pa.array(self.dates))},
+            metadata={'name': self.name, 'start': str(self.start), 'end': str(self.end)})
+
+    @classmethod
+    def from_arrow(cls, table):
+        meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        dates = table.column('dates').combine_chunks()
+        offsets = dates.offsets.to_numpy()
+        return cls(table.column('title').to_pylist(),
+                   table.column('interval').fill_null(cls.NO_INTERVAL).to_numpy(),
+                   offsets - offsets[0], dates.flatten().to_numpy(),
+                   int(meta['start']), int(meta['end']), meta.get('name', 'timeline'))
+
+
+class Schedule():
+    '''recurring schedule of the rows of a timeline with an interval: every
+    date is due again interval months later. A row is overdue from a due
+    month until its next date (a date in the due month is on time), its
+    last period runs until as_of (month ordinal, the current month for
+    None). Dates after as_of are left out. Computed for all rows at once
+    on the timeline's arrays.
+
+    Per row with interval and dates, sorted by row: rows, interval, last
+    (date), next_due, overdue (months past next_due as of as_of), late
+    (overdue periods), overdue_months (their total length) and max_gap
+    (most months between two dates, -1 for a single date). All overdue
+    periods [start, end) as period_rows, period_starts, period_ends'''
+    def __init__(self, timeline: 'Timeline', as_of: Optional[int]=None):
+        self.timeline = timeline
+        self.as_of = current_month() if as_of is None else int(as_of)
+        rows = timeline.row_index()
+        intervals = timeline.intervals[rows]
+        # dates after as_of haven't happened yet as of then
+        scheduled = (intervals > 0) & (timeline.dates <= self.as_of)
+        rows, dates, intervals = rows[scheduled], timeline.dates[scheduled], intervals[scheduled]
+        order = np.lexsort((dates, rows))
+        rows, dates, intervals = rows[order], dates[order], intervals[order]
+        due = dates + intervals
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = rows[1:] != rows[:-1]
+        after = np.append(dates[1:], 0)         # next date of the row
+        ends = np.where(last, self.as_of, after)
+        period = due < ends
+        self.period_rows, self.period_starts, self.period_ends = rows[period], due[period], ends[period]
+
+        self.rows = rows[last]
+        self.interval = intervals[last]
+        self.last = dates[last]
+        self.next_due = due[last]
+        self.overdue = np.maximum(self.as_of - self.next_due, 0)
+        position = np.searchsorted(self.rows, self.period_rows)
+        self.late = np.bincount(position, minlength=len(self.rows))
+        self.overdue_months = np.bincount(position, self.period_ends - self.period_starts,
+                                          minlength=len(self.rows)).astype(np.int64)
+        gaps = np.where(last, -1, after - dates)
+        firsts = np.flatnonzero(np.append(True, last[:-1]))
+        self.max_gap = np.maximum.reduceat(gaps, firsts) if len(gaps) else gaps
+
+    def __len__(self):
+        return len(self.rows)
+
+    def status(self):
+        '''per row 'überfällig', 'fällig' (due this month) or 'ok' as array'''
+        return np.where(self.overdue > 0, 'überfällig',
+                        np.where(self.next_due == self.as_of, 'fällig', 'ok'))
+
+    def report(self, overdue_only: bool=False):
+        '''rows of the schedule report as dicts of strings'''
+        keep = self.overdue > 0 if overdue_only else slice(None)
+        titles = self.timeline.titles
+        columns = (self.rows[keep].tolist(), self.interval[keep].tolist(), self.last[keep].tolist(),
+                   self.next_due[keep].tolist(), self.status()[keep].tolist(),
+                   self.overdue[keep].tolist(), self.late[keep].tolist(),
+                   self.overdue_months[keep].tolist(), self.max_gap[keep].tolist())
+        return [{'name': self.timeline.name, 'title': titles[row], 'interval': str(interval),
+                 'last': ordinal2monthyear(last), 'next_due': ordinal2monthyear(next_due),
+                 'status': status, 'overdue': str(overdue), 'late': str(late),
+                 'overdue_months': str(months), 'max_gap': str(max_gap)}
+                for row, interval, last, next_due, status, overdue, late, months, max_gap
+                in zip(*columns)]
+
+
+class RenderStyle():
+    '''fonts and font size of the plots. The font is the first of fonts
+    that is installed, looked up once per process instead of matplotlib
+    searching (and warning about) a missing font on every render. context()
+    applies the style with rc_context while a plot is built or drawn, the
+    global rcParams stay untouched. The fonts can also be set with
+    TIMELINER_FONTS, e.g. "Arial,Liberation Sans"'''
+    fonts = ('Arial', 'Liberation Sans', 'Helvetica', 'Nimbus Sans', 'DejaVu Sans')
+    lock = threading.RLock()            # rc_context swaps the process wide rcParams
+
+    def __init__(self, fonts=None, font_size: float=11):
+        if fonts is None and os.environ.get('TIMELINER_FONTS'):
+            fonts = [font.strip() for font in os.environ['TIMELINER_FONTS'].split(',')]
+        if fonts: self.fonts = tuple(fonts)
+        self.font_size = font_size
+
+    def font(self) -> str:
+        return resolve_font(self.fonts)
+
+    def rc(self):
+        return {'font.family': [self.font()], 'font.size': self.font_size,
+                'axes.titlesize': self.font_size, 'axes.labelsize': self.font_size,
+                'xtick.labelsize': self.font_size}
+
+    def key(self):
+        '''identifies the look for the render cache'''
+        return f'{self.font()}|{self.font_size}'
+
+    @contextmanager
+    def context(self):
+        import matplotlib as mpl
+        with self.lock, mpl.rc_context(self.rc()): yield
+
+
+default_style = RenderStyle()
+
+
+class TimelinePlot():
+    '''figure and axes of a timeline. All date markers are drawn by one
+    artist, all interval bars by one LineCollection and the start/end guides
+    by another one, no matter how many rows and dates there are. update()
+    only touches what changed, so the preview can reuse one figure for the
+    whole session'''
+    def __init__(self, style: Optional['RenderStyle']=None, overdue_as_of: Optional[int]=None):
+        self.style = style or default_style
+        self.overdue_as_of = overdue_as_of      # shade overdue periods (see Schedule) if set
+        self.timeline = None            # currently displayed Timeline
+        self.startend = None
+        self.layout_key = None          # (labels, start/end) the layout was computed for
+        self.default_xlim = None
+        self.data_key = None            # (digest, view, level) of the drawn markers and bars
+        self.pyramid = None             # DensityPyramid of the timeline, built when needed
+        self.draft = False
+        with self.style.context(): self._build()
+
+    def _build(self):
+        from matplotlib.figure import Figure
+        import matplotlib.dates as mdates
+        import matplotlib.patches as mpatches
+        from matplotlib.collections import LineCollection
+
+        self.fig = Figure(figsize=(5.5, .5))
+        self.ax = self.fig.subplots()
 
-        self.canvas_window = self.canvas.create_window((4,4),
-                                            window=self.viewPort, anchor="nw",            #add view port frame to canvas
-                                            tags="self.viewPort")
-
-        self.viewPort.bind("<Configure>", self.onFrameConfigure)                       #bind an event whenever the size of the viewPort frame changes.
-        self.canvas.bind("<Configure>", self.onCanvasConfigure)                       #bind an event whenever the size of the canvas frame changes.
-        
-        if use_mousewheel:
-            self.viewPort.bind('<Enter>', self.onEnter)                                 # bind wheel events when the cursor enters the control
-            self.viewPort.bind('<Leave>', self.onLeave)                                 # unbind wheel events when the cursorl leaves the control
-
-        self.onFrameConfigure(None)                                                 #perform an initial stretch on render, otherwise the scroll region has a tiny border until the first resize
-
-    def onFrameConfigure(self, event):                                              
-        '''Reset the scroll region to encompass the inner frame'''
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))                 #whenever the size of the frame changes, alter the scroll region respectively.
-
-    def onCanvasConfigure(self, event):
-        '''Reset the canvas window to encompass inner frame when required'''
-        canvas_width = event.width
-        canvas_height = event.height
-        kw = {'width': canvas_width} if self.orient == 'vertical' else {'height': canvas_height}
-        self.canvas.itemconfig(self.canvas_window, **kw)            #whenever the size of the canvas changes alter the window region respectively.
-
-    def onMouseWheel(self, event):                                                  # cross platform scroll wheel event
-        def func(self, *args): 
-            if self.orient == 'vertical' and \
-                    self.canvas.winfo_height() < self.viewPort.winfo_height():
-                self.canvas.yview_scroll(*args)
-            elif self.orient == 'horizontal' and \
-                    self.canvas.winfo_width() < self.viewPort.winfo_width():
-                self.canvas.xview_scroll(*args)
-        fac = -1
+        # format axis
+        ax = self.ax
+        ax.spines[['top', 'left', 'right', 'bottom']].set_visible(False)
+        ax.tick_params(axis='y', which='both', length=0)
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%y'))
+        ax.tick_params(axis='x', which='both', direction='inout', length=6, labelrotation=45)
 
-        if platform.system() == 'Windows':
-            func(self, int(fac*(event.delta/120)), "units")
-        elif platform.system() == 'Darwin':
-            func(self, int(-1 * event.delta), "units")
-        else:
-            if event.num == 4:
-                func(self,  -1, "units" )
-            elif event.num == 5:
-                func(self, 1, "units" )
+        # one artist per artist type
+        self.markers, = ax.plot([], [], 'k|', markersize=8, markeredgewidth=2, zorder=3)
+        # zoomed out, markers are drawn as one image with a pixel per bucket
+        self.density = ax.imshow(np.zeros((1, 1, 4), dtype=np.uint8), aspect='auto',
+                                 interpolation='nearest', zorder=3, visible=False)
+        self.bars = LineCollection([], colors='tab:blue', linewidth=2,
+                                   alpha=0.35, zorder=2)
+        self.guides = LineCollection([], colors='tab:gray', linestyles='--',
+                                     linewidths=1, alpha=.5, zorder=1,
+                                     transform=ax.get_xaxis_transform())
+        self.overdue = LineCollection([], colors='tab:red', linewidth=8, alpha=.2,
+                                      capstyle='butt', zorder=1.5)
+        ax.add_collection(self.bars, autolim=False)
+        ax.add_collection(self.guides, autolim=False)
+        ax.add_collection(self.overdue, autolim=False)
+        # (artist, color, alpha) of the translucent artists
+        self.blended = [(self.bars, 'tab:blue', .35), (self.guides, 'tab:gray', .5),
+                        (self.overdue, 'tab:red', .2)]
+        # add arrow as x axis
+        self.arrow = mpatches.FancyArrowPatch(
+            (0, 0), (1, 0),
+            arrowstyle='-|>',
+            mutation_scale=10,
+            color='black',
+            linewidth=0.8,
+            clip_on=False
+        )
+        ax.add_patch(self.arrow)
+
+    def update(self, timeline: 'Timeline', view=None, lod: bool=False):
+        '''brings the figure in line with timeline. view: x limits (date
+        numbers) to zoom to, the whole timeline for None. With lod, markers
+        and bars are aggregated per month bucket once a month is narrower
+        than a pixel. Returns True if markers and interval bars had to be
+        rebuilt'''
+        with self.style.context(): return self._update(timeline, view, lod)
+
+    def draw(self, canvas):
+        with self.style.context(): canvas.draw()
+
+    def set_draft(self, draft: bool):
+        '''switches to a look that is quicker to draw: a plain bottom spine
+        instead of the arrow, colors premixed with white instead of alpha
+        blending and no antialiasing of lines and markers'''
+        if draft == self.draft: return
+        from matplotlib.colors import to_rgb
+        self.draft = draft
+        self.arrow.set_visible(not draft)
+        self.ax.spines['bottom'].set_visible(draft)
+        for artist, color, alpha in self.blended:
+            artist.set_alpha(None if draft else alpha)
+            artist.set_color(1 - alpha * (1 - np.array(to_rgb(color))) if draft else color)
+            artist.set_antialiased(not draft)
+        self.markers.set_antialiased(not draft)
+
+    def savefig(self, *args, **kwargs):
+        with self.style.context(): self.fig.savefig(*args, **kwargs)
+
+    def _update(self, timeline: 'Timeline', view=None, lod=False):
+        nrows = len(timeline)
+        if (timeline.start, timeline.end) != self.startend:
+            self.set_xaxis(timeline.start, timeline.end)
+        self.timeline = timeline
+
+        # Assign y positions to each title, top title first
+        labels = [title.replace('|', '\n') for title in timeline.titles]
+        self.ax.set_yticks(range(nrows), labels)
+        self.ax.set_ylim(nrows-1+nrows/10, -nrows/10)
+        if (labels, self.startend) != self.layout_key:
+            self.set_layout(labels)
+            self.layout_key = (labels, self.startend)
+
+        view = tuple(view) if view is not None else None
+        self.ax.set_xlim(view or self.default_xlim)
+        level = self.lod_level() if lod else 0
+        data_key = (timeline.digest(), view if view or level else None, level)
+        changed = data_key != self.data_key
+        if changed:
+            months = None if view is None and not level else \
+                tuple(num2ordinals(self.ax.get_xlim()).tolist())
+            if level: self.set_density(timeline, level, months)
+            else: self.set_data(timeline, months)
+            if self.overdue_as_of is not None: self.set_overdue(timeline, months)
+            self.data_key = data_key
+
+        xmin, xmax = self.ax.get_xlim()
+        ymin, _ = self.ax.get_ylim()
+        self.arrow.set_positions((xmin, ymin), (xmax, ymin))
+        return changed
+
+    def set_layout(self, labels):
+        '''sizes the figure and places the axes at margins computed from the
+        label extents, which are measured once per label text. Drawing then
+        never has to solve a layout, and the rows get nrows/3 inches no
+        matter how long the labels are. Labels too long for the usual width
+        widen the figure so the axes keep min_axes_width. All sizes in points'''
+        font, size = self.style.font(), self.style.font_size
+        pad = 5                         # around the figure
+        tick_pad = 3.5
+        width = 5.5 * 72
+        min_axes_width = 3 * 72
+        rows_height = max(len(labels), 1) / 3 * 72
+        extents = {label: text_extent(label, font, size) for label in set(labels)}
+        start, end = self.startend
+        ticks = month_ticks(start, end, start, end).tolist()
+        tick_w, tick_h = np.max([text_extent(f'{t % 12 + 1:02d}/{t // 12 % 100:02d}', font, size)
+                                 for t in ticks], axis=0)
+        tick_diag = (tick_w + tick_h) / 2**.5   # extent of a label rotated by 45°
+
+        left = pad + max((w for w, _ in extents.values()), default=0) + tick_pad
+        # half of the inout x ticks, pad and the rotated labels below the axes
+        bottom = pad + 3 + tick_pad + tick_diag
+        top = right = pad
+        # the end tick label may need more than pad on the right
+        width = max(width, left + min_axes_width + pad + tick_diag/2)
+        if labels:
+            # labels of the first and last row stick out if they are higher
+            # than the gap between row and axes edge
+            ymax, ymin = self.ax.get_ylim()
+            gap = rows_height / (ymax - ymin) * len(labels) / 10
+            top += max(0, extents[labels[0]][1]/2 - gap)
+            bottom = max(bottom, pad + extents[labels[-1]][1]/2 - gap)
+        # the x labels at start and end are centered on their ticks
+        xmin, xmax = self.default_xlim
+        x_start, x_end = ordinals2num([start, end])
+        scale = (width - left - right) / (xmax - xmin)
+        left = max(left, pad + tick_diag/2 - (x_start - xmin) * scale)
+        right = max(right, pad + tick_diag/2 - (xmax - x_end) * scale)
+
+        height = bottom + rows_height + top
+        self.fig.set_size_inches(width / 72, height / 72)
+        self.fig.subplots_adjust(left=left/width, right=1-right/width,
+                                 bottom=bottom/height, top=1-top/height)
+
+    def lod_level(self):
+        '''level of the DensityPyramid for the current x limits: 0 (exact)
+        as long as a month is at least a pixel wide, else buckets of 2**level
+        months about a pixel wide'''
+        xmin, xmax = self.ax.get_xlim()
+        params = self.fig.subplotpars
+        pixels = self.fig.get_figwidth() * self.fig.dpi * (params.right - params.left)
+        months_per_pixel = (xmax - xmin) / 30.44 / max(pixels, 1)
+        if months_per_pixel <= 1: return 0
+        return int(np.ceil(np.log2(months_per_pixel)))
+
+    def set_data(self, timeline: 'Timeline', months=None):
+        '''rebuilds markers and interval bars of all rows in one vectorized
+        step, only those touching months (first, last ordinal) if given'''
+        ys = timeline.row_index()
+        dates = timeline.dates
+        intervals = timeline.intervals[ys]
+        # blue interval lines, clipped to the end date
+        has_bar = intervals != Timeline.NO_INTERVAL
+        ends = np.minimum(dates + intervals, timeline.end)
+        visible = slice(None)
+        if months is not None:
+            lo, hi = months
+            visible = (dates >= lo) & (dates <= hi)
+            has_bar &= (dates <= hi) & (ends >= lo)
+        self.markers.set_data(ordinals2num(dates[visible]), ys[visible])
+        self.density.set_visible(False)
+
+        bar_starts = dates[has_bar]
+        bar_ends = ends[has_bar]
+        segments = np.empty((len(bar_starts), 2, 2))
+        segments[:, 0, 0] = ordinals2num(bar_starts)
+        segments[:, 1, 0] = ordinals2num(bar_ends)
+        segments[:, :, 1] = ys[has_bar, None]
+        self.bars.set_segments(segments)
+
+    def set_density(self, timeline: 'Timeline', level: int, months):
+        '''draws markers and bars aggregated into buckets of 2**level months
+        touching months (first, last ordinal). The darker a bucket, the more
+        dates it holds'''
+        if self.pyramid is None or self.pyramid.digest != timeline.digest():
+            self.pyramid = DensityPyramid(timeline)
+        (counts, first, end), (bar_rows, bar_firsts, bar_ends) = \
+            self.pyramid.visible(level, *months)
+        self.markers.set_data([], [])
+        # three image rows per timeline row, the middle one holds the markers
+        image = np.zeros((3*len(counts), counts.shape[1], 4), dtype=np.uint8)
+        alpha = (255 * (.4 + .6 * counts / max(counts.max(initial=1), 1))).astype(np.uint8)
+        image[1::3, :, 3] = np.where(counts > 0, alpha, 0)
+        self.density.set_data(image)
+        x_first, x_end = ordinals2num([first, end])
+        self.density.set_extent((x_first, x_end, len(counts) - .5, -.5))
+        self.density.set_visible(True)
+        segments = np.empty((len(bar_rows), 2, 2))
+        segments[:, 0, 0] = ordinals2num(bar_firsts)
+        segments[:, 1, 0] = ordinals2num(bar_ends)
+        segments[:, :, 1] = bar_rows[:, None]
+        self.bars.set_segments(segments)
+
+    def set_overdue(self, timeline: 'Timeline', months=None):
+        '''shades the overdue periods up to the end, only those touching
+        months (first, last ordinal) if given'''
+        schedule = Schedule(timeline, self.overdue_as_of)
+        starts = schedule.period_starts
+        ends = np.minimum(schedule.period_ends, timeline.end)
+        keep = starts < ends
+        if months is not None: keep &= (starts <= months[1]) & (ends >= months[0])
+        segments = np.empty((np.count_nonzero(keep), 2, 2))
+        segments[:, 0, 0] = ordinals2num(starts[keep])
+        segments[:, 1, 0] = ordinals2num(ends[keep])
+        segments[:, :, 1] = schedule.period_rows[keep, None]
+        self.overdue.set_segments(segments)
+
+    def set_xaxis(self, start: int, end: int):
+        '''sets limits, ticks and start/end guides of the x axis, start and
+        end as month ordinals'''
+        ax = self.ax
+        self.startend = (start, end)
+        # Set x-axis limits
+        start_day, end_day = months2days([start, end])
+        datespan = (end_day-start_day) / 30 # months
+        self.default_xlim = tuple(ordinals2num([start-1, end+round(datespan/20)]).tolist())
+        ax.set_xlim(self.default_xlim)
+        ax.xaxis.set_major_locator(month_grid_locator_class()(start, end))
+
+        x_start, x_end = ordinals2num([start, end])
+        self.guides.set_segments([[(x_start, 0), (x_start, 1)],
+                                  [(x_end, 0), (x_end, 1)]])
+
+
+class DensityPyramid():
+    '''markers and interval bar coverage of a timeline counted in buckets of
+    2**level months, so a zoomed out plot needs segments per occupied
+    bucket instead of per event. Levels are built from the month data on
+    first use and kept'''
+    def __init__(self, timeline: 'Timeline'):
+        self.digest = timeline.digest()
+        self.nrows = len(timeline)
+        rows = timeline.row_index()
+        dates = timeline.dates
+        self.base = min(timeline.start - 1, int(dates.min()) if len(dates) else timeline.start)
+        self.rows = rows
+        self.months = dates - self.base
+        intervals = timeline.intervals[rows]
+        has_bar = intervals != Timeline.NO_INTERVAL
+        starts = self.months[has_bar]
+        ends = np.maximum(np.minimum(dates[has_bar] + intervals[has_bar], timeline.end) - self.base,
+                          starts)
+        self.bar_runs = merge_runs(rows[has_bar], starts, ends)
+        self.span = max(int(self.months.max()) if len(dates) else 0,
+                        timeline.end - self.base) + 1
+        self.levels = {}
+
+    def level(self, level: int):
+        '''(rows, buckets, counts) of the markers and (rows, first bucket,
+        end bucket) of the bar runs at level'''
+        if level not in self.levels:
+            width = (self.span >> level) + 2
+            keys, counts = np.unique(self.rows * width + (self.months >> level),
+                                     return_counts=True)
+            rows, starts, ends = self.bar_runs
+            starts = starts >> level
+            runs = merge_runs(rows, starts, np.maximum(((ends - 1) >> level) + 1, starts))
+            self.levels[level] = (keys // width, keys % width, counts, runs)
+        return self.levels[level]
+
+    def visible(self, level: int, lo: int, hi: int):
+        '''markers and bar runs at level touching the months lo to hi
+        (ordinals): (counts, first, end) with the number of dates per row
+        and bucket as (nrows, nbuckets) array and the month ordinals where
+        the first bucket starts and the last one ends, and (rows, first, end)
+        of the bar runs in month ordinals'''
+        rows, buckets, counts, (bar_rows, bar_starts, bar_ends) = self.level(level)
+        lo, hi = (lo - self.base) >> level, (hi - self.base) >> level
+        keep = (buckets >= lo) & (buckets <= hi)
+        grid = np.zeros((self.nrows, hi - lo + 1), dtype=np.int64)
+        grid[rows[keep], buckets[keep] - lo] = counts[keep]
+        keep = (bar_starts <= hi) & (bar_ends > lo)
+        bars = (bar_rows[keep], self.base + (bar_starts[keep] << level),
+                self.base + (bar_ends[keep] << level))
+        return (grid, self.base + (lo << level), self.base + ((hi + 1) << level)), bars
+
+
+class PreviewRenderer():
+    '''renders the preview on a worker thread. The Tk thread only hands over
+    a Timeline with submit() and gets the finished RGBA buffer and the
+    geometry of the plot passed to on_done (in the Tk thread). Every
+    request is first drawn as a draft (TimelinePlot.set_draft) at
+    1/draft_scale of the dpi, to be shown enlarged by draft_scale, and
+    refined to full quality from the same figure once there was no new
+    request for refine_ms. As long as the labels stay the same, drafts
+    skip the y axis, which takes most of the drawing time, and show the
+    label column of the last refined image instead. export() saves images
+    with the same figure on the worker, so the export reuses its layout.
+    Only the newest request is kept, a render that
+    got outdated by newer input is dropped before drawing or its result is
+    thrown away'''
+    poll_ms = 30
+    refine_ms = 250
+    draft_scale = 2
+
+    def __init__(self, master: tk.Misc, on_done, dpi: Optional[float]=None):
+        self.master = master
+        # on_done(rgba, None, geometry, scale) or on_done(None, exception, None, 1)
+        self.on_done = on_done
+        self.dpi = dpi                  # of the refined image, the figure's default for None
+        self.cond = threading.Condition()
+        self.generation = 0             # increased with every request
+        self.request = None             # (generation, timeline, view) waiting for the worker
+        # (generation, rgba, error, geometry, scale, final) waiting for the Tk thread
+        self.result = None
+        self.export_request = None      # (timeline, cache, fmt, dpi, future) for the worker
+        self.idle = False               # the worker waits for a request
+        self.labels = None              # (layout key, rgba) of the y label column, worker only
+        self.last_key = None            # content and view of the newest request
+        self.submitted = None           # perf_counter() of the newest request
+        self.thread = None
+        self.poll_id = None
+
+    def submit(self, timeline: 'Timeline', view=None):
+        '''requests a render of timeline zoomed to view (x limits in date
+        numbers, everything for None), does nothing if the newest request
+        already has the same content and view'''
+        if (timeline.digest(), view) == self.last_key: return
+        self.last_key = (timeline.digest(), view)
+        self.submitted = time.perf_counter()
+        with self.cond:
+            self.generation += 1
+            self.request = (self.generation, timeline, view)
+            self.cond.notify()
+        self.start()
+        if self.poll_id is None:
+            self.poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def start(self):
+        '''starts the worker thread, it sets up matplotlib and draws a first
+        plot right away, so call it early to have the first preview as fast
+        as the following ones'''
+        if self.thread is not None: return
+        self.thread = threading.Thread(target=self._work, daemon=True,
+                                       name='preview-renderer')
+        self.thread.start()
+
+    def is_stale(self, generation):
+        return generation != self.generation
+
+    def export(self, timeline: 'Timeline', cache: 'RenderCache', fmt: str='png',
+               dpi: int=300) -> bytes:
+        '''image bytes of all of timeline from cache.render, drawn by the
+        worker with the preview's figure if it is waiting for input, else
+        (while it draws, warms up or if it failed) on the calling thread.
+        Blocks until it is done'''
+        from concurrent.futures import Future
+        future = Future()
+        self.start()
+        with self.cond:
+            idle = self.idle and self.thread.is_alive()
+            if idle:
+                self.export_request = (timeline, cache, fmt, dpi, future)
+                self.cond.notify()
+        if not idle: return cache.render(timeline, fmt, dpi)
+        return future.result()
+
+    def _export(self, plot, timeline, cache, fmt, dpi, future):
+        try:
+            plot.set_draft(False)
+            plot.ax.yaxis.set_visible(True)
+            future.set_result(cache.render(timeline, fmt, dpi, plot=plot))
+        except Exception as e:
+            future.set_exception(e)
 
-    def onEnter(self, event):                                                       # bind wheel events when the cursor enters the control
-        if platform.system() == 'Linux':
-            self.canvas.bind_all("<Button-4>", self.onMouseWheel)
-            self.canvas.bind_all("<Button-5>", self.onMouseWheel)
-        else:
-            self.canvas.bind_all("<MouseWheel>", self.onMouseWheel)
+    def _fail(self, error):
+        '''answers every request with the error of the warm-up'''
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.request is not None)
+                self.result = (self.request[0], None, error, None, 1, True)
+                self.request = None
 
-    def onLeave(self, event):                                                       # unbind wheel events when the cursorl leaves the control
-        if platform.system() == 'Linux':
-            self.canvas.unbind_all("<Button-4>")
-            self.canvas.unbind_all("<Button-5>")
-        else:
-            self.canvas.unbind_all("<MouseWheel>")
-
-    def gotoTop(self, *args):
-        self.canvas.yview_moveto(0)
-
-def monthyear2datetime(monthyear_str):
-    '''converts strings like '01/24' to a pandas datetime object (01.01.2024)
-    handles mm/yy or mm/yyyy'''
-    _, year = monthyear_str.split('/')
-    if len(year) == 2: year_format = 'y'
-    elif len(year) == 4: year_format = 'Y'
-    else: raise ValueError(f'monthyear falsch formatiert. Erwartet mm/yy oder mm/yyyy, nicht {monthyear_str}')
-    return pd.to_datetime(monthyear_str, format=f'%m/%{year_format}')
-
-
-def delete_children(widget, leave_out=None):
-    '''delete a widgets children. leave out can by a type of widget or specific
-    widget'''
-    for w in widget.winfo_children():
-        if leave_out:
+    def _work(self):
+        try:
+            with tracer.span('preview.warm_up'):
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                plot = TimelinePlot()
+                canvas = FigureCanvasAgg(plot.fig)
+                dpi = self.dpi or plot.fig.dpi
+                # loads fonts and fills matplotlib's caches
+                plot.update(Timeline.from_rows([TimelineRow('Zeitstrahl', ['01/20'], 12)],
+                                               '01/20', '01/25'))
+                plot.draw(canvas)
+        except Exception as e:
+            # exports are drawn by the caller as long as the worker isn't idle
+            return self._fail(e)
+        drafted = None          # (generation, timeline, view) still to be refined
+        while True:
+            with self.cond:
+                # refine once there was no new input for a while
+                self.idle = True
+                self.cond.wait_for(lambda: self.request is not None or self.export_request is not None,
+                                   None if drafted is None else self.refine_ms / 1000)
+                self.idle = False
+                export, request = self.export_request, self.request
+                if export is not None: self.export_request = None
+                else: self.request = None
+            if export is not None:
+                self._export(plot, *export)
+                continue
+            if request is not None:
+                drafted = None
+                generation, timeline, view = request
+            else:
+                (generation, timeline, view), drafted = drafted, None
             try:
-                if isinstance(w, leave_out): continue
-            except TypeError: pass
-            if w == leave_out: continue
-        w.destroy()
-
-
-root = TimelineEditor()
-root.mainloop()
+                with tracer.profile('preview'):
+                    # the level of detail is chosen for the refined image, an
+                    # export in between may have changed it
+                    plot.fig.set_dpi(dpi)
+                    with tracer.span('preview.update', rows=len(timeline)):
+                        plot.update(timeline, view, lod=True)
+                    if self.is_stale(generation): continue
+                    if request is not None:
+                        with tracer.span('preview.draft', rows=len(timeline)):
+                            result = self._draw(plot, canvas, generation, dpi / self.draft_scale, draft=True)
+                    else:
+                        with tracer.span('preview.draw', rows=len(timeline)):
+                            result = self._draw(plot, canvas, generation, dpi, draft=False)
+            except Exception as e:
+                result = (generation, None, e, None, 1, True)
+            if request is not None and result[2] is None: drafted = request
+            with self.cond:
+                if not self.is_stale(generation): self.result = result
+
+    def _draw(self, plot, canvas, generation, dpi, draft):
+        plot.fig.set_dpi(dpi)
+        plot.set_draft(draft)
+        reuse_labels = draft and self.labels is not None and self.labels[0] == plot.layout_key
+        plot.ax.yaxis.set_visible(not reuse_labels)
+        plot.draw(canvas)
+        # copy, the buffer gets reused by the next draw
+        rgba = np.array(canvas.buffer_rgba())
+        extent = plot.ax.get_window_extent()
+        # left of the axes and above its bottom there are only the y labels
+        height, width = len(rgba) - int(np.ceil(extent.y0)), int(extent.x0) - 1
+        scale = self.draft_scale if draft else 1
+        if reuse_labels:
+            labels = self.labels[1]
+            h, w = len(labels) // scale, labels.shape[1] // scale
+            labels = labels[:h*scale, :w*scale].reshape(h, scale, w, scale, 4).mean(axis=(1, 3))
+            h, w = min(h, height), min(w, width)
+            rgba[:h, :w] = labels[:h, :w]
+        elif not draft:
+            self.labels = (plot.layout_key, rgba[:height, :width].copy())
+        # where the x axis is in the shown image, for zooming and panning
+        # (pixels from the left, date numbers)
+        geometry = (extent.x0 * scale, extent.x1 * scale, plot.ax.get_xlim(), plot.default_xlim)
+        return (generation, rgba, None, geometry, scale, not draft)
+
+    def _poll(self):
+        with self.cond:
+            result, self.result = self.result, None
+            # the (refined) image of the newest request is still to come
+            pending = self.request is not None or result is None or not result[5] \
+                or self.is_stale(result[0])
+        if result is not None and not self.is_stale(result[0]):
+            # from the request until the image reaches the Tk thread
+            elapsed = (time.perf_counter() - self.submitted) * 1000
+            tracer.record('preview.total' if result[5] else 'preview.first', elapsed)
+            self.on_done(*result[1:5])
+        self.poll_id = self.master.after(self.poll_ms, self._poll) if pending else None
+
+
+class RenderCache():
+    '''rendered images addressed by their content: the key is a hash of the
+    timeline data, format, dpi and style, so unchanged timelines are never
+    drawn again. Keeps up to max_bytes in memory (least recently used ones
+    are evicted) and, if directory is given, also stores the images there so
+    later batch runs can reuse them'''
+    version = 2                         # increase when the look of the plot changes
+
+    def __init__(self, max_bytes: int=64*2**20, directory: Optional[str]=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()    # key: image bytes, most recently used last
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def key(self, timeline: 'Timeline', fmt: str='png', dpi: int=300, style: str=''):
+        return hashlib.blake2b(
+            f'{self.version}|{fmt}|{dpi}|{style}|'.encode() + timeline.digest(),
+            digest_size=20).hexdigest()
+
+    def path(self, key, fmt):
+        return os.path.join(self.directory, key[:2], f'{key}.{fmt}')
+
+    def get(self, key, fmt='png'):
+        '''image bytes or None'''
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+        if self.directory is not None:
+            try:
+                with open(self.path(key, fmt), 'rb') as f: data = f.read()
+            except FileNotFoundError: pass
+            else:
+                with self.lock: self.disk_hits += 1
+                self.put(key, data, fmt, to_disk=False)
+                return data
+        with self.lock: self.misses += 1
+        return None
+
+    def put(self, key, data: bytes, fmt='png', to_disk=True):
+        with self.lock:
+            if key in self.entries: self.nbytes -= len(self.entries.pop(key))
+            self.entries[key] = data
+            self.nbytes += len(data)
+            while self.nbytes > self.max_bytes and len(self.entries) > 1:
+                _, old = self.entries.popitem(last=False)
+                self.nbytes -= len(old)
+        if to_disk and self.directory is not None:
+            path = self.path(key, fmt)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write under a temporary name first, other workers may read the file
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f: f.write(data)
+            os.replace(tmp_path, path)
+
+    def render(self, timeline: 'Timeline', fmt: str='png', dpi: int=300,
+               overdue_as_of: Optional[int]=None, plot: Optional['TimelinePlot']=None):
+        '''returns the image bytes of the timeline, rendered only on a cache
+        miss. overdue_as_of: see TimelinePlot. plot: a TimelinePlot with the
+        same overdue_as_of to draw with instead of a new one, its figure and
+        layout are reused'''
+        style = default_style.key()
+        if overdue_as_of is not None: style += f'|overdue {overdue_as_of}'
+        key = self.key(timeline, fmt, dpi, style)
+        if (data := self.get(key, fmt)) is not None: return data
+        buf = io.BytesIO()
+        with tracer.profile('render'):
+            with tracer.span('render.figure', rows=len(timeline)):
+                if plot is None: plot = TimelinePlot(overdue_as_of=overdue_as_of)
+                plot.update(timeline)
+            with tracer.span('render.savefig', rows=len(timeline), fmt=fmt, dpi=dpi):
+                plot.savefig(buf, format=fmt, dpi=dpi)
+        data = buf.getvalue()
+        self.put(key, data, fmt)
+        return data
+
+    def stats(self):
+        return {'hits': self.hits, 'disk_hits': self.disk_hits,
+                'misses': self.misses, 'entries': len(self.entries),
+                'bytes': self.nbytes}
+
+
+class Tracer():
+    '''named timing spans around the phases of editing, preview, export and
+    batch rendering. The duration of every span is kept in last (shown in
+    the editor's status bar), with a trace file set every span is also
+    written there as one JSON line. With a profile folder set, code in
+    profile() blocks runs under cProfile and the stats are dumped there as
+    .pstats files. Configured by the environment variables TIMELINER_TRACE
+    (file, '-' for stderr) and TIMELINER_PROFILE (folder) or by --trace and
+    --profile'''
+    def __init__(self, trace: Optional[str]=None, profile_dir: Optional[str]=None):
+        self.last = {}                  # span name: ms of the latest run
+        self.lock = threading.Lock()
+        self.profile_lock = threading.Lock()    # only one cProfile can run at a time
+        self.out = None
+        self.configure(trace, profile_dir)
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get('TIMELINER_TRACE'), os.environ.get('TIMELINER_PROFILE'))
+
+    def configure(self, trace: Optional[str]=None, profile_dir: Optional[str]=None):
+        if self.out not in (None, sys.stderr): self.out.close()
+        if not trace: self.out = None
+        elif trace == '-': self.out = sys.stderr
+        else: self.out = open(trace, 'a', buffering=1, encoding='utf-8')
+        self.profile_dir = profile_dir or None
+        if self.profile_dir: os.makedirs(self.profile_dir, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.out is not None or self.profile_dir is not None
+
+    @contextmanager
+    def span(self, name: str, /, **fields):
+        '''times the block as span name, fields are added to the record'''
+        t0 = time.perf_counter()
+        try: yield
+        finally: self.record(name, (time.perf_counter() - t0) * 1000, **fields)
+
+    def record(self, name: str, ms: float, /, **fields):
+        self.last[name] = ms
+        if self.out is None: return
+        line = json.dumps({'span': name, 'ms': round(ms, 3), 'time': time.time(),
+                           'pid': os.getpid(), 'thread': threading.current_thread().name,
+                           **fields})
+        with self.lock: self.out.write(line + '\n')
+
+    @contextmanager
+    def profile(self, name: str):
+        '''runs the block under cProfile if a profile folder is set (and no
+        other block is being profiled) and dumps name-pid-ns.pstats'''
+        if self.profile_dir is None or not self.profile_lock.acquire(blocking=False):
+            yield
+            return
+        import cProfile
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try: yield
+            finally: profiler.disable()
+            profiler.dump_stats(os.path.join(
+                self.profile_dir, f'{name}-{os.getpid()}-{time.time_ns()}.pstats'))
+        finally: self.profile_lock.release()
+
+
+tracer = Tracer.from_env()
+
+
+class TimelineStore():
+    '''SQLite storage of timelines (the inspection database). Timelines are
+    stored normalized, one line per timeline, row and date, with indices
+    for lookups by object name, title and date range. Writes happen in
+    batched transactions, connections are pooled so several threads can
+    read at once'''
+    schema = '''
+        CREATE TABLE IF NOT EXISTS timelines (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            start_month INTEGER NOT NULL,
+            end_month INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS rows (
+            timeline_id INTEGER NOT NULL REFERENCES timelines(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            interval INTEGER,
+            PRIMARY KEY (timeline_id, position)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS dates (
+            timeline_id INTEGER NOT NULL REFERENCES timelines(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            idx INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            PRIMARY KEY (timeline_id, position, idx)) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS rows_title ON rows (title);
+        CREATE INDEX IF NOT EXISTS dates_month ON dates (month, timeline_id);
+    '''
+    max_vars = 500                      # stay below SQLite's limit of host parameters
+
+    def __init__(self, path: str='timelines.sqlite', pool_size: int=4):
+        self.path = path
+        self.pool_size = pool_size
+        self.pool = queue.LifoQueue()
+        with self.connection() as con:
+            con.executescript(self.schema)
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, check_same_thread=False)
+        con.execute('PRAGMA foreign_keys = ON')
+        con.execute('PRAGMA journal_mode = WAL')
+        con.execute('PRAGMA synchronous = NORMAL')
+        return con
+
+    @contextmanager
+    def connection(self):
+        '''a connection from the pool (a new one if all are in use)'''
+        try: con = self.pool.get_nowait()
+        except queue.Empty: con = self._connect()
+        try: yield con
+        finally:
+            if self.pool.qsize() < self.pool_size: self.pool.put(con)
+            else: con.close()
+
+    def close(self):
+        while not self.pool.empty(): self.pool.get_nowait().close()
+
+    def save(self, timelines, batch_size: int=500):
+        '''writes timelines, replacing stored ones with the same name.
+        batch_size timelines are written per transaction. Returns the number
+        of timelines written'''
+        n = 0
+        with self.connection() as con:
+            for batch in batched(timelines, min(batch_size, self.max_vars)):
+                batch = list({tl.name: tl for tl in batch}.values())
+                names = [tl.name for tl in batch]
+                with con:
+                    con.executemany('DELETE FROM timelines WHERE name = ?',
+                                    [(name,) for name in names])
+                    con.executemany('INSERT INTO timelines (name, start_month, end_month) '
+                                    'VALUES (?, ?, ?)',
+                                    [(tl.name, tl.start, tl.end) for tl in batch])
+                    ids = dict(con.execute(
+                        f'SELECT name, id FROM timelines WHERE name IN ({",".join("?"*len(names))})',
+                        names))
+                    con.executemany('INSERT INTO rows VALUES (?, ?, ?, ?)',
+                                    [(ids[tl.name], pos, title,
+                                      None if interval == Timeline.NO_INTERVAL else interval)
+                                     for tl in batch
+                                     for pos, (title, interval) in enumerate(zip(tl.titles, tl.intervals.tolist()))])
+                    con.executemany('INSERT INTO dates VALUES (?, ?, ?, ?)',
+                                    [(ids[tl.name], pos, idx, month)
+                                     for tl in batch
+                                     for pos, idx, month in zip(tl.row_index().tolist(),
+                                                                tl.col_index().tolist(),
+                                                                tl.dates.tolist())])
+                n += len(batch)
+        return n
+
+    def load(self, names=None):
+        '''returns the stored timelines with the given names (all for None)
+        in the order of names, unknown names are skipped'''
+        if names is None:
+            with self.connection() as con:
+                names = [name for name, in con.execute('SELECT name FROM timelines ORDER BY name')]
+        timelines = {}
+        with self.connection() as con:
+            for chunk in batched(names, self.max_vars):
+                params = ','.join('?'*len(chunk))
+                heads = con.execute(f'SELECT id, name, start_month, end_month FROM timelines '
+                                    f'WHERE name IN ({params})', chunk).fetchall()
+                if not heads: continue
+                ids = [head[0] for head in heads]
+                params = ','.join('?'*len(ids))
+                rows = con.execute(f'SELECT timeline_id, title, interval FROM rows '
+                                   f'WHERE timeline_id IN ({params}) ORDER BY timeline_id, position',
+                                   ids).fetchall()
+                dates = np.array(con.execute(
+                    f'SELECT timeline_id, position, month FROM dates '
+                    f'WHERE timeline_id IN ({params}) ORDER BY timeline_id, position, idx',
+                    ids).fetchall(), dtype=np.int64).reshape(-1, 3)
+                rows_by_id = {}
+                for row in rows: rows_by_id.setdefault(row[0], []).append(row)
+                for tl_id, name, start, end in heads:
+                    tl_rows = rows_by_id.get(tl_id, [])
+                    lo, hi = np.searchsorted(dates[:, 0], [tl_id, tl_id+1])
+                    counts = np.bincount(dates[lo:hi, 1], minlength=len(tl_rows))
+                    timelines[name] = Timeline(
+                        [row[1] for row in tl_rows],
+                        [Timeline.NO_INTERVAL if row[2] is None else row[2] for row in tl_rows],
+                        np.concatenate([[0], np.cumsum(counts)]), dates[lo:hi, 2],
+                        start, end, name)
+        return [timelines[name] for name in names if name in timelines]
+
+    def find(self, name: Optional[str]=None, title: Optional[str]=None,
+             date_from=None, date_to=None):
+        '''names of the timelines matching the given object name, having a
+        row with the given title and/or a date between date_from and date_to
+        (mm/yy or month ordinals, both inclusive)'''
+        query = ['SELECT DISTINCT t.name FROM timelines t']
+        where, params = [], []
+        if title is not None:
+            query.append('JOIN rows r ON r.timeline_id = t.id')
+            where.append('r.title = ?')
+            params.append(title)
+        if date_from is not None or date_to is not None:
+            query.append('JOIN dates d ON d.timeline_id = t.id'
+                         + (' AND d.position = r.position' if title is not None else ''))
+            for value, op in ((date_from, '>='), (date_to, '<=')):
+                if value is None: continue
+                where.append(f'd.month {op} ?')
+                params.append(monthyear2ordinal(value) if isinstance(value, str) else int(value))
+        if name is not None:
+            where.append('t.name = ?')
+            params.append(name)
+        if where: query.append('WHERE ' + ' AND '.join(where))
+        query.append('ORDER BY t.name')
+        with self.connection() as con:
+            return [name for name, in con.execute(' '.join(query), params)]
+
+    def delete(self, names):
+        with self.connection() as con, con:
+            con.executemany('DELETE FROM timelines WHERE name = ?', [(name,) for name in names])
+
+
+@lru_cache(maxsize=8192)
+def monthyear2ordinal(monthyear_str: str) -> int:
+    '''converts strings like '01/24' or '01/2024' to the month ordinal
+    year*12 + month-1 without going through pandas/strptime. Two digit years
+    follow strptime: 69-99 -> 19xx, 00-68 -> 20xx. Results are cached as the
+    same strings get parsed on every preview'''
+    month, sep, year = monthyear_str.strip().partition('/')
+    if not (sep and month.isdigit() and year.isdigit() and (month+year).isascii()
+            and len(month) <= 2 and len(year) in (2, 4)):
+        raise ValueError(f'monthyear falsch formatiert. Erwartet mm/yy oder mm/yyyy, nicht {monthyear_str}')
+    if not 1 <= int(month) <= 12:
+        raise ValueError(f'Monat muss zwischen 01 und 12 liegen, nicht {monthyear_str}')
+    if len(year) == 2: year = int(year) + (1900 if int(year) >= 69 else 2000)
+    return int(year)*12 + int(month)-1
+
+
+def monthyears2ordinals(date_strs) -> np.ndarray:
+    '''parses a whole column of mm/yy strings into an int64 array of month
+    ordinals (see monthyear2ordinal)'''
+    return np.fromiter(map(monthyear2ordinal, date_strs), dtype=np.int64)
+
+
+def ordinal2monthyear(ordinal: int) -> str:
+    '''converts a month ordinal back to 'mm/yy' ('mm/yyyy' outside of the
+    years 1969-2068, which two digits can't express)'''
+    year, month = divmod(int(ordinal), 12)
+    if 1969 <= year <= 2068: return f'{month+1:02d}/{year % 100:02d}'
+    return f'{month+1:02d}/{year}'
+
+
+def current_month() -> int:
+    '''month ordinal of today'''
+    today = datetime.now()
+    return today.year*12 + today.month-1
+
+
+def parse_interval(interval) -> Optional[int]:
+    '''None or an empty string for no interval, otherwise a whole number of
+    months'''
+    if interval is None: return None
+    if isinstance(interval, str):
+        if not (interval := interval.strip()): return None
+    # int() would turn True and 1.5 into 1
+    if isinstance(interval, bool) or isinstance(interval, float) and not interval.is_integer():
+        raise ValueError(f'Intervall muss zahlwertig oder leer sein, nicht {interval!r}')
+    try: interval = int(interval)
+    except (TypeError, ValueError):
+        raise ValueError(f'Intervall muss zahlwertig oder leer sein, nicht {interval!r}') from None
+    if interval < 0: raise ValueError('Intervall darf nicht negativ sein.')
+    return interval
+
+
+def ordinal2datetime(ordinal: int) -> datetime:
+    '''converts a month ordinal to a datetime (first of the month)'''
+    year, month = divmod(int(ordinal), 12)
+    return datetime(year, month+1, 1)
+
+
+def ordinals2num(ordinals):
+    '''converts month ordinals to matplotlib date numbers (first of month)'''
+    import matplotlib.dates as mdates
+    months = np.asarray(ordinals, dtype=np.int64) - 1970*12
+    return mdates.date2num(months.astype('datetime64[M]'))
+
+
+def num2ordinals(nums):
+    '''converts matplotlib date numbers to the month ordinals they fall in'''
+    days = np.floor(np.asarray(nums, dtype=float)).astype(np.int64)
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) + 1970*12
+
+
+def months2days(ordinals):
+    '''days since 1970-01-01 of the first of the months (month ordinals)'''
+    months = np.asarray(ordinals, dtype=np.int64) - 1970*12
+    return months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+
+
+@lru_cache(maxsize=None)
+def resolve_font(fonts: tuple) -> str:
+    '''the first installed font of fonts, matplotlib's DejaVu Sans if none is.
+    The first call loads (or builds) matplotlib's font list'''
+    from matplotlib import font_manager
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    return next((font for font in fonts if font in installed), 'DejaVu Sans')
+
+
+@lru_cache(maxsize=None)
+def _measure_figure():
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(dpi=72)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+@lru_cache(maxsize=4096)
+def text_extent(text: str, font: str, size: float):
+    '''(width, height) in points of text (may have several lines) as Agg
+    draws it'''
+    from matplotlib.text import Text
+    fig = _measure_figure()
+    label = Text(0, 0, text, fontfamily=font, fontsize=size)
+    label.set_figure(fig)
+    return tuple(label.get_window_extent(fig.canvas.get_renderer()).size)
+
+
+@lru_cache(maxsize=256)
+def month_ticks(start: int, end: int, lo: int, hi: int):
+    '''x ticks (month ordinals) for the months lo to hi of a timeline from
+    start to end: a grid of whole years or months like AutoDateLocator
+    would pick for lo to hi, plus start and end if they are visible. Grid
+    ticks too close to start or end are dropped so their labels don't
+    overlap'''
+    span = hi - lo
+    if span // 12 >= 5:
+        step = 12 * next((n for n in (1, 2, 4, 5, 10, 20, 40, 50, 100, 200, 400, 500,
+                                      1000, 2000, 4000, 5000) if span // 12 <= n*10), 10000)
+    else:
+        step = next((n for n in (1, 2, 3, 4, 6) if span <= n*11), 6)
+    grid = np.arange(-(-lo // step) * step, hi+1, step)
+    days = months2days(grid)
+    lo_day, hi_day = months2days([lo, hi])
+    min_distance = round((hi_day-lo_day)/30*1.5)
+    keep = np.ones(len(grid), dtype=bool)
+    for edge, edge_day in zip((start, end), months2days([start, end])):
+        keep &= ~((grid != edge) & (np.abs(days - edge_day) <= min_distance))
+    edges = [edge for edge in (start, end) if lo <= edge <= hi]
+    ticks = np.union1d(grid[keep], edges)
+    ticks.flags.writeable = False       # shared by all calls with the same arguments
+    return ticks
+
+
+@lru_cache(maxsize=None)
+def month_grid_locator_class():
+    '''MonthGridLocator, created on first use so matplotlib is only imported
+    when a figure is built'''
+    from matplotlib.ticker import Locator
+
+    class MonthGridLocator(Locator):
+        '''month ticks of a timeline from start to end (month ordinals) with
+        both edges always labelled, see month_ticks. Follows zoom and pan:
+        the grid is picked for the visible part of the timeline'''
+        def __init__(self, start: int, end: int):
+            self.start = start
+            self.end = end
+
+        def __call__(self):
+            return self.tick_values(*self.axis.get_view_interval())
+
+        def tick_values(self, vmin, vmax):
+            vmin, vmax = sorted((vmin, vmax))
+            # first and last month beginning in the view
+            lo, hi = num2ordinals([vmin, vmax])
+            if ordinals2num(lo) < vmin: lo += 1
+            if lo > hi: return []
+            if lo <= self.end and hi >= self.start:
+                lo, hi = max(lo, self.start), min(hi, self.end)
+            return ordinals2num(month_ticks(self.start, self.end, int(lo), int(hi)))
+
+    return MonthGridLocator
+
+
+def batched(iterable, n):
+    '''yields lists of n items (the last one may be shorter)'''
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == n:
+            yield batch
+            batch = []
+    if batch: yield batch
+
+
+def parse_date_cell(date: str):
+    '''state of a typed date cell: None if blank, the month ordinal or the
+    ValueError of an invalid date'''
+    date = date.strip()
+    if not date: return None
+    try: return monthyear2ordinal(date)
+    except ValueError as e: return e
+
+
+def merge_runs(rows, starts, ends):
+    '''unions the month ranges [start, end) per row. Returns (rows, starts,
+    ends) of the resulting runs, which neither overlap nor touch, sorted by
+    row and start'''
+    rows, starts, ends = (np.asarray(a, dtype=np.int64) for a in (rows, starts, ends))
+    if not len(rows): return rows, starts, ends
+    # shift the rows apart so one cumulative max works for all of them
+    low = min(int(starts.min()), 0)
+    width = int(ends.max()) - low + 2
+    first = rows * width + starts - low
+    order = np.argsort(first, kind='stable')
+    first = first[order]
+    reach = np.maximum.accumulate((rows * width + ends - low)[order])
+    new = np.ones(len(first), dtype=bool)
+    new[1:] = first[1:] > reach[:-1]
+    begins = np.flatnonzero(new)
+    run_rows = first[begins] // width
+    run_ends = reach[np.append(begins[1:] - 1, len(first) - 1)]
+    return (run_rows, first[begins] - run_rows*width + low,
+            run_ends - run_rows*width + low)
+
+
+def set_if_changed(var: tk.Variable, value):
+    '''sets a Tk variable only if the value differs, avoids needless traces
+    and entry redraws'''
+    if var.get() != value: var.set(value)
+
+
+def render_timeline(timeline: Timeline, overdue_as_of: Optional[int]=None) -> 'Figure':
+    '''return a matplotlib figure showing the timeline, with overdue periods
+    as of overdue_as_of shaded if given. Works without any Tk window. Draw
+    or save it within default_style.context() to get the configured fonts'''
+    plot = TimelinePlot(overdue_as_of=overdue_as_of)
+    plot.update(timeline)
+    return plot.fig
+
+
+def save_pages(timeline: Timeline, path: str, rows_per_page: int=40,
+               fmt: Optional[str]=None, overdue_as_of: Optional[int]=None):
+    '''saves the timeline split into pages of rows_per_page rows, each page
+    with its own date axis and start/end guides. pdf: one multi-page file,
+    svg: one file per page (path_001.svg, ...). Both are vector formats and
+    the pages are drawn and written one after another with a single figure,
+    so memory use does not grow with the number of rows. Returns the
+    written paths'''
+    fmt = (fmt or os.path.splitext(path)[1][1:]).lower()
+    with tracer.profile('pages'):
+        plot = TimelinePlot(overdue_as_of=overdue_as_of)
+        if fmt == 'pdf':
+            from matplotlib.backends.backend_pdf import PdfPages
+            with PdfPages(path, metadata={'Title': timeline.name}) as pdf:
+                for i, page in enumerate(timeline.pages(rows_per_page), 1):
+                    with tracer.span('pages.page', page=i, rows=len(page), fmt=fmt):
+                        plot.update(page)
+                        with plot.style.context(): pdf.savefig(plot.fig)
+            return [path]
+        if fmt == 'svg':
+            stem = os.path.splitext(path)[0]
+            paths = []
+            for i, page in enumerate(timeline.pages(rows_per_page), 1):
+                with tracer.span('pages.page', page=i, rows=len(page), fmt=fmt):
+                    plot.update(page)
+                    paths.append(f'{stem}_{i:03d}.svg')
+                    plot.savefig(paths[-1], format='svg')
+            return paths
+        raise ValueError(f'unknown page format {fmt}, expected pdf or svg')
+
+
+def load_timelines(path):
+    '''reads timelines for batch rendering from a .json, .jsonl or .csv file
+    as dicts for Timeline.from_dict, or all Timelines from a TimelineStore
+    (.sqlite or .db).
+    json: list of (or single) {"name", "start", "end", "rows": [{"title",
+    "interval", "dates"}]}. jsonl: one such object per line. csv: columns
+    name, start, end, title, interval, dates with dates separated by spaces
+    or ";" and one line per timeline row'''
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.sqlite', '.db'):
+        store = TimelineStore(path)
+        try: return store.load()
+        finally: store.close()
+    with open(path, newline='', encoding='utf-8') as f:
+        if ext == '.json':
+            timelines = json.load(f)
+            if isinstance(timelines, dict): timelines = [timelines]
+        elif ext == '.jsonl':
+            timelines = [json.loads(line) for line in f if line.strip()]
+        elif ext == '.csv':
+            timelines = {}
+            for rec in csv.DictReader(f):
+                name = rec['name'].strip()
+                tl = timelines.setdefault(name, {'name': name, 'start': rec['start'],
+                                                 'end': rec['end'], 'rows': []})
+                tl['rows'].append({'title': rec['title'],
+                                   'interval': rec.get('interval'),
+                                   'dates': rec['dates'].replace(';', ' ').split()})
+            timelines = list(timelines.values())
+        else: raise ValueError(f'unknown file type {ext}, expected .json, .jsonl, .csv, .sqlite or .db')
+    for i, tl in enumerate(timelines):
+        tl.setdefault('name', f'timeline_{i}')
+    return timelines
+
+
+# header names of logbook exports, lower case
+LOGBOOK_COLUMNS = {'title': 'title', 'titel': 'title',
+                   'interval': 'interval', 'intervall': 'interval',
+                   'date': 'dates', 'datum': 'dates', 'dates': 'dates', 'daten': 'dates'}
+
+
+def excel_cell2str(value) -> str:
+    '''text of an Excel cell as it would be typed: dates as mm/yy, whole
+    numbers without decimals'''
+    if value is None: return ''
+    if isinstance(value, datetime): return ordinal2monthyear(value.year*12 + value.month-1)
+    if isinstance(value, float) and value.is_integer(): return str(int(value))
+    return str(value)
+
+
+def iter_table(path):
+    '''streams the lines of a .csv (delimiter "," ";" or tab) or .xlsx file
+    (first sheet) as (line number, cells, progress), progress being the read
+    fraction of the file'''
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        size = os.path.getsize(path) or 1
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            try: dialect = csv.Sniffer().sniff(f.read(4096), delimiters=',;\t')
+            except csv.Error: dialect = csv.excel
+            f.seek(0)
+            for n, cells in enumerate(csv.reader(f, dialect), 1):
+                yield n, cells, f.buffer.tell() / size
+    elif ext in ('.xlsx', '.xlsm'):
+        try: import openpyxl
+        except ImportError:
+            raise ValueError('Für Excel-Dateien wird openpyxl benötigt (pip install openpyxl).') from None
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            total = sheet.max_row or 0
+            for n, cells in enumerate(sheet.iter_rows(values_only=True), 1):
+                yield n, [excel_cell2str(cell) for cell in cells], n / total if total else 0
+        finally: workbook.close()
+    else: raise ValueError(f'unknown file type {ext}, expected .csv or .xlsx')
+
+
+def read_logbook(path, chunk_size: int=1000):
+    '''streams timeline rows from a logbook export (.csv or .xlsx) with the
+    columns title, interval and date (or Titel, Intervall, Datum), one entry
+    per line. A date cell may hold several dates separated by spaces, "," or
+    ";". Yields (rows, errors, progress) per chunk_size lines: the lines'
+    TimelineRows (lines with the same title merged), one "Zeile n: ..."
+    message per skipped line or date and the read fraction of the file.
+    Blank lines don't count towards chunk_size'''
+    lines = iter_table(path)
+    try: _, header, _ = next(lines)
+    except StopIteration: return
+    columns = {LOGBOOK_COLUMNS[name.strip().lower()]: i for i, name in enumerate(header)
+               if name.strip().lower() in LOGBOOK_COLUMNS}
+    if 'title' not in columns or 'dates' not in columns:
+        raise ValueError('Die Datei braucht die Spalten Titel und Datum, gefunden: '
+                         + ', '.join(header))
+    rows, errors, progress = {}, [], 0
+    count = 0                           # lines that weren't blank
+    for n, cells, progress in lines:
+        if not any(cell.strip() for cell in cells): continue
+        count += 1
+        title, interval, dates = (cells[columns[col]].strip()
+                                  if col in columns and columns[col] < len(cells) else ''
+                                  for col in ('title', 'interval', 'dates'))
+        if not title: errors.append(f'Zeile {n}: Titel fehlt.')
+        else:
+            try: interval = parse_interval(interval)
+            except ValueError as e: errors.append(f'Zeile {n} ({title}): {e}')
+            else:
+                ordinals = []
+                for date in re.split(r'[\s,;]+', dates):
+                    if not date: continue
+                    try: ordinals.append(monthyear2ordinal(date))
+                    except ValueError as e: errors.append(f'Zeile {n} ({title}): {e}')
+                row = rows.setdefault(title, [interval, []])
+                if row[0] is None: row[0] = interval
+                row[1].extend(ordinals)
+        if count % chunk_size == 0:
+            yield [TimelineRow(title, dates, interval) for title, (interval, dates) in rows.items()], errors, progress
+            rows, errors = {}, []
+    yield [TimelineRow(title, dates, interval) for title, (interval, dates) in rows.items()], errors, 1.
+
+
+_worker_cache = None
+
+
+def _init_render_worker(cache_dir=None, warm_up=False):
+    # every worker process sets up matplotlib once and keeps it for all its jobs
+    global _worker_cache
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.figure
+    default_style.font()
+    _worker_cache = RenderCache(max_bytes=16*2**20, directory=cache_dir)
+    if warm_up:
+        # loads fonts and fills matplotlib's caches before the first request
+        _worker_cache.render(Timeline.from_rows([TimelineRow('Zeitstrahl', ['01/20'], 12)],
+                                                '01/20', '01/25'), 'png', 100)
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+def _render_requests(requests):
+    '''renders [(timeline dict, fmt, dpi)] in a worker process, returns
+    [(image bytes, error)], error being (http status, message) or None.
+    Identical requests of the batch are rendered once'''
+    keys = [(json.dumps(job, sort_keys=True), fmt, dpi) for job, fmt, dpi in requests]
+    results = {}
+    for key, (job, fmt, dpi) in zip(keys, requests):
+        if key in results: continue
+        try:
+            timeline, _ = Timeline.from_dict(job).clipped()
+            results[key] = (_worker_cache.render(timeline, fmt, dpi), None)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            results[key] = (None, (400, f'Zeitstrahlfehler: {type(e).__name__}: {e}'))
+        except Exception as e:
+            results[key] = (None, (500, f'{type(e).__name__}: {e}'))
+    return [results[key] for key in keys]
+
+
+def unique_names(names):
+    '''names with _2, _3, ... appended to repeated ones, so every output
+    file gets its own name'''
+    taken = set(names)
+    seen = set()
+    unique = []
+    for name in names:
+        if name in seen:
+            n = 2
+            while f'{name}_{n}' in taken: n += 1
+            name = f'{name}_{n}'
+            taken.add(name)
+        seen.add(name)
+        unique.append(name)
+    return unique
+
+
+def _render_job(job, outdir, dpi, fmt='png', rows_per_page=40, overdue_as_of=None,
+                file_name=None):
+    '''renders a single timeline (Timeline or dict as from load_timelines) to
+    png or paged pdf/svg in outdir, named file_name (the timeline's name by
+    default), returns (name, path, error, cached). Dates newer than the end
+    are dropped'''
+    global _worker_cache
+    if _worker_cache is None: _worker_cache = RenderCache(max_bytes=16*2**20)
+    name = job.name if isinstance(job, Timeline) else job['name']
+    if file_name is None: file_name = name
+    with tracer.span('batch.job', name=name, fmt=fmt):
+        try:
+            # the file has to stay in outdir
+            if file_name in ('', '.', '..') or '/' in file_name or '\\' in file_name:
+                raise ValueError(f'Name taugt nicht als Dateiname: {file_name!r}')
+            timeline = job if isinstance(job, Timeline) else Timeline.from_dict(job)
+            timeline, _ = timeline.clipped()
+            if fmt != 'png':
+                paths = save_pages(timeline, os.path.join(outdir, f'{file_name}.{fmt}'),
+                                   rows_per_page, fmt, overdue_as_of)
+                return name, paths[0], None, False
+            misses = _worker_cache.misses
+            data = _worker_cache.render(timeline, 'png', dpi, overdue_as_of)
+            path = os.path.join(outdir, f'{file_name}.png')
+            with open(path, 'wb') as f: f.write(data)
+            return name, path, None, _worker_cache.misses == misses
+        except Exception as e:
+            return name, None, f'{type(e).__name__}: {e}', False
+
+
+def render_batch(timelines, outdir, dpi=300, workers=None, chunksize=16,
+                 cache_dir=None, fmt='png', rows_per_page=40, overdue_as_of=None):
+    '''renders all timelines to png (or paged pdf/svg, see save_pages) files
+    in outdir on a process pool, with overdue periods shaded if
+    overdue_as_of is given. png images of timelines already rendered to
+    cache_dir are reused. The files are named after the timelines, repeated
+    names get a suffix (see unique_names) and names with a path are turned
+    down. Yields (name, path, error, cached) in input order'''
+    from concurrent.futures import ProcessPoolExecutor
+    os.makedirs(outdir, exist_ok=True)
+    file_names = unique_names([job.name if isinstance(job, Timeline) else job['name']
+                               for job in timelines])
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(cache_dir,)) as pool:
+        n = len(timelines)
+        yield from pool.map(_render_job, timelines, [outdir]*n, [dpi]*n, [fmt]*n,
+                            [rows_per_page]*n, [overdue_as_of]*n, file_names,
+                            chunksize=chunksize)
+
+
+class RenderServer():
+    '''local HTTP server rendering timelines on demand, on a Unix socket or
+    on a TCP port (localhost by default). POST /render?format=png|svg|pdf&dpi=N
+    with a timeline as JSON ({"name", "start", "end", "rows": [{"title",
+    "interval", "dates"}]}, as for Timeline.from_dict) answers with the image,
+    GET /metrics with counters and latencies as JSON, GET /health with ok.
+
+    Rendering happens on a process pool whose workers set up matplotlib and
+    draw a first plot at start. Requests wait in a queue of max_queue
+    entries, further ones are turned down with 503 (backpressure), and are
+    handed to the workers in batches of up to batch_size requests collected
+    within batch_ms, at most one batch per worker at a time'''
+    content_types = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf'}
+    max_body = 16*2**20
+    max_dpi = 600
+
+    def __init__(self, workers: Optional[int]=None, batch_size: int=8, batch_ms: float=5,
+                 max_queue: int=64, cache_dir: Optional[str]=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_ms = batch_ms
+        self.max_queue = max_queue
+        self.cache_dir = cache_dir
+        self.pool = None
+        self.queue = None               # (request, future, start time) waiting for a batch
+        self.slots = None               # one per worker, taken while a batch renders
+        self.busy = 0                   # batches being rendered
+        self.dispatcher = None
+        self.tasks = set()              # run_batch tasks, the loop only keeps weak references
+        self.started = time.perf_counter()
+        self.counts = {'requests': 0, 'rendered': 0, 'errors': 0, 'rejected': 0,
+                       'batches': 0, 'batched_requests': 0}
+        self.latencies = deque(maxlen=10000)    # (end time, seconds) of rendered requests
+
+    async def start(self, host: str='127.0.0.1', port: int=8765, socket_path: Optional[str]=None):
+        '''starts the workers and waits until they are ready, then listens.
+        Returns the asyncio server'''
+        import asyncio
+        from concurrent.futures import ProcessPoolExecutor
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_render_worker,
+                                        initargs=(self.cache_dir, True))
+        loop = asyncio.get_running_loop()
+        with tracer.span('server.warm_up', workers=self.workers):
+            await asyncio.gather(*(loop.run_in_executor(self.pool, _worker_ready)
+                                   for _ in range(self.workers)))
+        self.queue = asyncio.Queue(self.max_queue)
+        self.slots = asyncio.Semaphore(self.workers)
+        self.dispatcher = asyncio.create_task(self.dispatch())
+        self.started = time.perf_counter()
+        if socket_path is not None:
+            return await asyncio.start_unix_server(self.handle, socket_path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        for task in [self.dispatcher, *self.tasks]:
+            if task is not None: task.cancel()
+        if self.pool is not None: self.pool.shutdown(cancel_futures=True)
+
+    async def render(self, job: dict, fmt: str='png', dpi: int=300):
+        '''image bytes of the timeline dict. Raises ValueError with (http
+        status, message) if the timeline is invalid or the queue is full'''
+        import asyncio
+        if self.queue.full():
+            self.counts['rejected'] += 1
+            raise ValueError(503, 'Warteschlange voll, bitte später erneut versuchen.')
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(((job, fmt, dpi), future, time.perf_counter()))
+        data, error = await future
+        if error is not None: raise ValueError(*error)
+        return data
+
+    async def dispatch(self):
+        '''collects queued requests into batches and renders them, waits
+        for a free worker before taking the next batch so requests pile up
+        in the bounded queue instead of the pool'''
+        import asyncio
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.slots.acquire()
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_ms / 1000
+            while len(batch) < self.batch_size:
+                try: batch.append(await asyncio.wait_for(self.queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError: break
+            task = asyncio.create_task(self.run_batch(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def run_batch(self, batch):
+        import asyncio
+        self.counts['batches'] += 1
+        self.counts['batched_requests'] += len(batch)
+        self.busy += 1
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.pool, _render_requests, [request for request, _, _ in batch])
+        except Exception as e:
+            results = [(None, (500, f'{type(e).__name__}: {e}'))] * len(batch)
+        finally:
+            self.busy -= 1
+            self.slots.release()
+        now = time.perf_counter()
+        for (_, future, t0), result in zip(batch, results):
+            self.latencies.append((now, now - t0))
+            if result[1] is None: self.counts['rendered'] += 1
+            if not future.done(): future.set_result(result)
+
+    def metrics(self):
+        '''counters, queue state, latency percentiles (ms) of the last 10000
+        renders and throughput (renders per second) of the last minute'''
+        now = time.perf_counter()
+        latencies = np.array([seconds for _, seconds in self.latencies]) * 1000
+        window = min(60, now - self.started)
+        recent = sum(1 for end, _ in self.latencies if end > now - 60)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+        return {**self.counts,
+                'queued': self.queue.qsize() if self.queue is not None else 0,
+                'busy_workers': self.busy,
+                'workers': self.workers,
+                'mean_batch_size': self.counts['batched_requests'] / max(self.counts['batches'], 1),
+                'latency_ms': {'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+                               'max': float(latencies.max(initial=0))},
+                'throughput_per_s': recent / window if window > 0 else 0,
+                'uptime_s': now - self.started}
+
+    async def handle(self, reader, writer):
+        '''serves the HTTP/1.1 requests of one connection (keep-alive)'''
+        from urllib.parse import urlsplit, parse_qs
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip(): break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > self.max_body:
+                    await self.respond(writer, 413, b'Anfrage zu gross.')
+                    break
+                body = await reader.readexactly(length) if length else b''
+                url = urlsplit(target)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                t0 = time.perf_counter()
+                status, content_type, data = await self.route(method, url.path, query, body)
+                await self.respond(writer, status, data, content_type)
+                tracer.record('server.request', (time.perf_counter() - t0) * 1000,
+                              path=url.path, status=status)
+                if headers.get('connection', '').lower() == 'close': break
+        except (ConnectionError, ValueError, EOFError): pass
+        finally: writer.close()
+
+    async def route(self, method, path, query, body):
+        '''(status, content type, body) of a request'''
+        if method == 'GET' and path == '/health':
+            return 200, 'text/plain', b'ok'
+        if method == 'GET' and path == '/metrics':
+            return 200, 'application/json', json.dumps(self.metrics()).encode()
+        if path != '/render':
+            return 404, 'text/plain; charset=utf-8', b'Nicht gefunden.'
+        if method != 'POST':
+            return 405, 'text/plain; charset=utf-8', b'Nur POST.'
+        self.counts['requests'] += 1
+        try:
+            fmt = query.get('format', 'png').lower()
+            if fmt not in self.content_types:
+                raise ValueError(400, f'Format muss png, svg oder pdf sein, nicht {fmt}.')
+            try: dpi = int(query.get('dpi', 300))
+            except ValueError: raise ValueError(400, 'dpi muss eine ganze Zahl sein.') from None
+            if not 1 <= dpi <= self.max_dpi:
+                raise ValueError(400, f'dpi muss zwischen 1 und {self.max_dpi} liegen.')
+            try: job = json.loads(body)
+            except ValueError as e: raise ValueError(400, f'Ungültiges JSON: {e}') from None
+            if not isinstance(job, dict): raise ValueError(400, 'Erwartet ein JSON-Objekt.')
+            return 200, self.content_types[fmt], await self.render(job, fmt, dpi)
+        except ValueError as e:
+            self.counts['errors'] += 1
+            status, message = e.args
+            return status, 'text/plain; charset=utf-8', message.encode()
+
+    async def respond(self, writer, status, data: bytes, content_type='text/plain; charset=utf-8'):
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  413: 'Payload Too Large', 500: 'Internal Server Error',
+                  503: 'Service Unavailable'}[status]
+        head = [f'HTTP/1.1 {status} {reason}', f'Content-Type: {content_type}',
+                f'Content-Length: {len(data)}']
+        if status == 503: head.append('Retry-After: 1')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+
+def serve(host='127.0.0.1', port=8765, socket_path=None, **kwargs):
+    '''runs a RenderServer until interrupted'''
+    import asyncio
+
+    async def run():
+        server = RenderServer(**kwargs)
+        try:
+            async with await server.start(host, port, socket_path) as listener:
+                where = socket_path or f'http://{host}:{port}'
+                print(f'Rendere auf {where} mit {server.workers} Prozessen', flush=True)
+                await listener.serve_forever()
+        finally: server.close()
+
+    try: asyncio.run(run())
+    except KeyboardInterrupt: pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='timeliner',
+                                     description='Timeline editor and renderer')
+    parser.add_argument('--db', default=None, help='SQLite timeline store to open from and save to')
+    parser.add_argument('--open', default=None, metavar='NAME', help='timeline in --db to edit')
+    parser.add_argument('--trace', default=None, metavar='FILE',
+                        help="write timings of all phases as JSON lines to FILE ('-' for stderr)")
+    parser.add_argument('--profile', default=None, metavar='DIR',
+                        help='run renders under cProfile and dump .pstats files to DIR')
+    parser.add_argument('--timings', action='store_true',
+                        help='show the duration of the last preview in a status bar')
+    parser.add_argument('--import', default=None, metavar='FILE', dest='import_path',
+                        help='logbook export (.csv or .xlsx) to import into the editor')
+    sub = parser.add_subparsers(dest='command')
+    render_p = sub.add_parser('render', help='render timelines from a file to png without GUI')
+    render_p.add_argument('input', help='.json, .jsonl, .csv, .sqlite or .db file with timelines')
+    render_p.add_argument('-o', '--outdir', default='.', help='output folder')
+    render_p.add_argument('-j', '--jobs', type=int, default=None,
+                          help='number of worker processes (default: cpu count)')
+    render_p.add_argument('--dpi', type=int, default=300)
+    render_p.add_argument('--cache', default=None, metavar='DIR',
+                          help='folder to keep rendered images in, unchanged timelines are copied from there')
+    render_p.add_argument('--format', choices=['png', 'pdf', 'svg'], default='png',
+                          help='pdf and svg are split into pages of --rows-per-page rows')
+    render_p.add_argument('--rows-per-page', type=int, default=40)
+    render_p.add_argument('--overdue', nargs='?', const='', default=None, metavar='MM/YY',
+                          help='shade overdue periods as of MM/YY (default: this month)')
+    schedule_p = sub.add_parser('schedule', help='report next due dates and overdue items as csv')
+    schedule_p.add_argument('input', help='.json, .jsonl, .csv, .sqlite or .db file with timelines')
+    schedule_p.add_argument('--as-of', default=None, metavar='MM/YY',
+                            help='month to compute overdue items for (default: this month)')
+    schedule_p.add_argument('--overdue-only', action='store_true')
+    schedule_p.add_argument('-o', '--output', default=None, help='csv file (default: stdout)')
+    serve_p = sub.add_parser('serve', help='render timelines on demand over local HTTP')
+    serve_p.add_argument('--host', default='127.0.0.1')
+    serve_p.add_argument('--port', type=int, default=8765)
+    serve_p.add_argument('--socket', default=None, metavar='PATH',
+                         help='listen on this Unix socket instead of host:port')
+    serve_p.add_argument('-j', '--jobs', type=int, default=None,
+                         help='number of worker processes (default: cpu count)')
+    serve_p.add_argument('--batch-size', type=int, default=8)
+    serve_p.add_argument('--batch-ms', type=float, default=5,
+                         help='how long to wait for more requests to fill a batch')
+    serve_p.add_argument('--queue', type=int, default=64,
+                         help='waiting requests before new ones are turned down with 503')
+    serve_p.add_argument('--cache', default=None, metavar='DIR',
+                         help='folder to keep rendered images in')
+    store_p = sub.add_parser('store', help='import timelines from a file into the --db store')
+    store_p.add_argument('input', help='.json, .jsonl or .csv file with timelines')
+    args = parser.parse_args(argv)
+    if args.trace or args.profile:
+        # also for the batch worker processes
+        for var, value in (('TIMELINER_TRACE', args.trace), ('TIMELINER_PROFILE', args.profile)):
+            if value: os.environ[var] = os.path.abspath(value) if value != '-' else value
+        tracer.configure(os.environ.get('TIMELINER_TRACE'), os.environ.get('TIMELINER_PROFILE'))
+
+    if args.command == 'render':
+        failed = cached = 0
+        timelines = load_timelines(args.input)
+        overdue_as_of = None if args.overdue is None else \
+            monthyear2ordinal(args.overdue) if args.overdue else current_month()
+        for name, _, error, from_cache in render_batch(timelines, args.outdir, args.dpi,
+                                                       args.jobs, cache_dir=args.cache,
+                                                       fmt=args.format,
+                                                       rows_per_page=args.rows_per_page,
+                                                       overdue_as_of=overdue_as_of):
+            cached += from_cache
+            if error is None: continue
+            failed += 1
+            print(f'{name}: {error}', file=sys.stderr)
+        print(f'{len(timelines)-failed}/{len(timelines)} Zeitstrahlen gespeichert in {args.outdir}'
+              f' ({cached} aus dem Cache)')
+        return 1 if failed else 0
+
+    if args.command == 'schedule':
+        as_of = monthyear2ordinal(args.as_of) if args.as_of else current_month()
+        failed = items = overdue = 0
+        out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+        try:
+            writer = csv.DictWriter(out, ['name', 'title', 'interval', 'last', 'next_due', 'status',
+                                          'overdue', 'late', 'overdue_months', 'max_gap'])
+            writer.writeheader()
+            for job in load_timelines(args.input):
+                try: timeline = job if isinstance(job, Timeline) else Timeline.from_dict(job)
+                except Exception as e:
+                    failed += 1
+                    print(f'{job["name"]}: {type(e).__name__}: {e}', file=sys.stderr)
+                    continue
+                with tracer.span('schedule', name=timeline.name, rows=len(timeline)):
+                    schedule = Schedule(timeline, as_of)
+                items += len(schedule)
+                overdue += np.count_nonzero(schedule.overdue)
+                writer.writerows(schedule.report(args.overdue_only))
+        finally:
+            if out is not sys.stdout: out.close()
+        print(f'{overdue}/{items} Arbeiten überfällig am {ordinal2monthyear(as_of)}', file=sys.stderr)
+        return 1 if failed else 0
+
+    if args.command == 'serve':
+        serve(args.host, args.port, args.socket, workers=args.jobs, batch_size=args.batch_size,
+              batch_ms=args.batch_ms, max_queue=args.queue, cache_dir=args.cache)
+        return 0
+
+    if args.command == 'store':
+        if args.db is None: parser.error('store needs --db')
+        timelines, failed = [], 0
+        for job in load_timelines(args.input):
+            try: timelines.append(Timeline.from_dict(job))
+            except Exception as e:
+                failed += 1
+                print(f'{job["name"]}: {type(e).__name__}: {e}', file=sys.stderr)
+        store = TimelineStore(args.db)
+        try: n = store.save(timelines)
+        finally: store.close()
+        print(f'{n}/{n+failed} Zeitstrahlen gespeichert in {args.db}')
+        return 1 if failed else 0
+
+    store = TimelineStore(args.db) if args.db is not None else None
+    root = TimelineEditor(store, args.open, show_timings=args.timings or tracer.enabled,
+                          import_path=args.import_path)
+    root.mainloop()
+    if store is not None: store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
 
 
 